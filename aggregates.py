@@ -0,0 +1,48 @@
+"""
+Aggregates Module
+
+This module buckets transactions by month, transaction type and category so that
+multi-month analyses can be answered from a single pass over the ledger.
+"""
+from typing import Dict, Iterable, Tuple
+
+
+class MonthlyAggregates:
+    """Transaction totals keyed by (year, month, transaction type[, category])."""
+
+    def __init__(self):
+        """Initialize empty aggregates."""
+        self.by_type: Dict[Tuple[int, int, str], float] = {}
+        self.by_category: Dict[Tuple[int, int, str, str], float] = {}
+
+    @classmethod
+    def from_transactions(cls, transactions: Iterable) -> "MonthlyAggregates":
+        """Build aggregates from transactions in one pass."""
+        aggregates = cls()
+        for t in transactions:
+            aggregates.add(t)
+        return aggregates
+
+    def add(self, transaction):
+        """Add a transaction to its buckets."""
+        date = transaction.parsed_date
+        key = (date.year, date.month, transaction.transaction_type)
+        self.by_type[key] = self.by_type.get(key, 0) + transaction.amount
+        category_key = key + (transaction.category,)
+        self.by_category[category_key] = self.by_category.get(category_key, 0) + transaction.amount
+
+    def total(self, year: int, month: int, transaction_type: str) -> float:
+        """Get the total for a transaction type in a month."""
+        return self.by_type.get((year, month, transaction_type), 0)
+
+    def category_total(self, year: int, month: int, transaction_type: str, category: str) -> float:
+        """Get the total for a category and transaction type in a month."""
+        return self.by_category.get((year, month, transaction_type, category), 0)
+
+    def totals_by_type(self, year: int, month: int) -> Dict[str, float]:
+        """Get the totals for every transaction type seen in a month."""
+        return {
+            transaction_type: total
+            for (y, m, transaction_type), total in self.by_type.items()
+            if y == year and m == month
+        }
@@ -0,0 +1,588 @@
+"""
+Benchmarks
+
+Performance benchmarks for the finance manager. Run one with:
+`python benchmark.py <name> [--rows N]`
+
+memory
+    Memory held by a ledger of Transaction objects loaded from JSON, compared
+    with the original plain dataclass (per-instance __dict__, no interning).
+    Measured with tracemalloc, 1,000,000 rows, CPython 3.11 on Linux x86-64:
+
+        plain dataclass:        383 MB  (383 bytes/row)
+        slotted + interned:     220 MB  (220 bytes/row)
+
+    The remaining cost is mostly the slotted object itself plus its own
+    description string, amount float and ordinal, which every row needs.
+
+insert
+    Import throughput into an empty JSON ledger: one add_transaction call per
+    row (each call rewrites the data file) versus a single add_transactions
+    call. The per-row loop is quadratic, so it only runs on the first 2,000 rows.
+    Measured with 200,000 rows:
+
+        add_transaction loop:       117 rows/s  (2,000 rows)
+        add_transactions:        92,578 rows/s
+
+import
+    End-to-end CSV statement import into an empty journaled ledger, including
+    parsing, duplicate detection and batched commits. Measured with
+    1,000,000 rows: 28 s, about 35,000 rows/s.
+
+fsync
+    One add_transaction call per row into a journaled ledger under different
+    fsync policies. Measured with 2,000 rows:
+
+        every write:           2,821 rows/s
+        every 100 writes:     17,777 rows/s
+        every 1 second:       20,271 rows/s
+        never:                22,162 rows/s
+
+    Measured on ext4 over a virtual disk; the gap grows on slower disks.
+
+writebehind
+    Goal progress updates on a tracker holding 1,000 goals, saving after
+    every update versus inside one ``batch()`` block. Measured with 2,000
+    updates:
+
+        save every update:        54 updates/s
+        batch:                40,904 updates/s
+
+startup
+    Time to open a ledger and read the balance: parsing the JSON data file
+    versus opening the memory-mapped binary snapshot. Measured with
+    1,000,000 rows:
+
+        JSON data file:       6,663 ms
+        binary snapshot:         16 ms
+
+analysis
+    An analysis-only run: open the ledger and compute monthly income versus
+    expenses for three years, from Transaction objects loaded from JSON
+    versus columns memory-mapped from the binary snapshot. Memory is the
+    peak traced by tracemalloc; mapped pages are shared page cache and not
+    counted. Measured with 1,000,000 rows:
+
+        objects:          7.38 s   295 MB peak
+        memory-mapped:    0.25 s    35 MB peak
+
+querycache
+    One visit to the report screens: twelve monthly reports and budget
+    statuses for a year plus the three analyses over 36 months, with the
+    query cache cold, warm, after a transaction dated today (only queries
+    covering the current month recompute) and after a back-dated one.
+    Measured with 1,000,000 rows:
+
+        cold:                     1,459 ms
+        warm:                      1.0 ms
+        new transaction today:      400 ms
+        back-dated to 2024-03:      474 ms
+
+budgets
+    Budget statuses for 35 budgets (weekly, monthly, quarterly, yearly and
+    custom for every category): the first evaluation aggregates each
+    distinct window once from the date index; afterwards every new
+    transaction is folded into the windows it falls in. Measured with
+    1,000,000 rows (the second line includes the journal write):
+
+        first evaluation:         407 ms
+        add + evaluate:          0.52 ms each
+
+alerts
+    add_transaction throughput on a write-behind ledger without budgets
+    versus with 35 budgets watched for 80% and 100% alerts, which updates
+    the running totals of the transaction's category only. Measured with
+    20,000 posts onto 1,000,000 rows:
+
+        no budgets:            58,027 transactions/s
+        35 budgets + alerts:   46,460 transactions/s
+
+lookups
+    Creating 10,000 budgets, goals and investments (write-behind), then
+    looking each one up or updating it by key through the dict indexes,
+    compared with the linear scan by name the lookups used to do:
+
+        create 3 x 10,000:          140 ms
+        look up / update 3 x 10,000: 79 ms
+        linear scan, 10,000 goals: 2,287 ms
+
+prices
+    A nightly price refresh on 5,000 holdings followed by the portfolio
+    value, profit/loss and allocation: one update_investment_price call per
+    holding (each rewrites and syncs investments.json, so only 500 are run)
+    versus a single update_prices call revalued with NumPy:
+
+        update_investment_price:        8 prices/s
+        update_prices:             45,685 prices/s  (110 ms in all)
+
+pricehistory
+    Five years of nightly update_prices calls on 2,000 holdings with the
+    price history enabled (2.6 million prices), then reopening it to read
+    one holding's prices for a year and computing the portfolio's
+    time-weighted return, volatility and drawdown over all of it. The last
+    line scans the same prices kept as JSON Lines, for comparison:
+
+        record, per night:             3.5 ms
+        on disk:                       31 MB  (12.5 bytes/price)
+        reopen + one holding's year:    25 ms
+        portfolio performance:         285 ms
+        JSON Lines scan:             6,624 ms  (177 MB)
+
+importtime
+    Import time of main.py measured with ``python -X importtime``, the
+    slowest modules it pulls in, and the wall time of a fresh process that
+    adds one transaction. matplotlib and numpy are only imported by the
+    features that use them. Exits with status 1 if either time exceeds
+    STARTUP_BUDGET_MS, so it can run as a check:
+
+        import main:        43.7 ms  (517 ms with matplotlib imported eagerly)
+        add transaction:    52.2 ms  (whole process)
+"""
+import os
+import sys
+import csv
+import json
+import time
+import random
+import tempfile
+import argparse
+import datetime
+import subprocess
+import tracemalloc
+from dataclasses import dataclass
+
+from finance_tracker import FinanceTracker, Transaction
+from storage import FsyncPolicy
+from financial_goals import GoalTracker
+from investment_tracker import InvestmentTracker
+from budget_planner import BudgetPlanner
+from financial_analysis import FinancialAnalysis
+from importer import StatementImporter
+
+
+@dataclass
+class PlainTransaction:
+    """The original Transaction layout, kept for comparison."""
+    amount: float
+    category: str
+    description: str
+    date: str
+    transaction_type: str
+
+
+CATEGORIES = ["Rent", "Groceries", "Dining", "Utilities", "Entertainment", "Travel", "Health"]
+
+
+def sample_rows(rows: int, seed: int = 0):
+    """Generate transaction dictionaries spread over about three years."""
+    rng = random.Random(seed)
+    start = datetime.date(2023, 1, 1).toordinal()
+    for i in range(rows):
+        income = rng.random() < 0.1
+        yield {
+            "amount": round(rng.uniform(1, 500), 2),
+            "category": "Salary" if income else rng.choice(CATEGORIES),
+            "description": f"Transaction {i}",
+            "date": datetime.date.fromordinal(start + rng.randrange(1095)).isoformat(),
+            "transaction_type": "income" if income else "expense"
+        }
+
+
+def measure(build):
+    """Run build() and return (result, bytes still allocated afterwards)."""
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current
+
+
+def peak_memory(run) -> int:
+    """Run run() and return the peak number of bytes allocated meanwhile."""
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_memory(rows: int):
+    """Compare the memory held by plain and compact transaction objects."""
+    # Round-trip through JSON so every row gets its own string objects, as on load
+    data = json.dumps(list(sample_rows(rows)))
+    for label, cls in (("plain dataclass", PlainTransaction), ("slotted + interned", Transaction)):
+        ledger, used = measure(lambda: [cls(**r) for r in json.loads(data)])
+        print(f"{label:20s} {used / 1e6:8.1f} MB  {used / rows:6.0f} bytes/row")
+        del ledger
+
+
+def bench_insert(rows: int):
+    """Compare per-row and batched import throughput."""
+    data = list(sample_rows(rows))
+    with tempfile.TemporaryDirectory() as tmp:
+        loop_rows = data[:2000]
+        tracker = FinanceTracker(os.path.join(tmp, "loop.json"))
+        start = time.perf_counter()
+        for r in loop_rows:
+            tracker.add_transaction(**r)
+        elapsed = time.perf_counter() - start
+        print(f"add_transaction loop  {len(loop_rows):8d} rows  {len(loop_rows) / elapsed:10.0f} rows/s")
+        
+        tracker = FinanceTracker(os.path.join(tmp, "batch.json"))
+        start = time.perf_counter()
+        tracker.add_transactions(data)
+        elapsed = time.perf_counter() - start
+        print(f"add_transactions      {rows:8d} rows  {rows / elapsed:10.0f} rows/s")
+
+
+def bench_import(rows: int):
+    """Measure CSV statement import throughput."""
+    with tempfile.TemporaryDirectory() as tmp:
+        statement = os.path.join(tmp, "statement.csv")
+        with open(statement, 'w', newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["Date", "Narration", "Withdrawal Amt.", "Deposit Amt.", "Category"])
+            for r in sample_rows(rows):
+                day = datetime.date.fromisoformat(r["date"]).strftime("%d/%m/%Y")
+                debit, credit = (r["amount"], "") if r["transaction_type"] == "expense" else ("", r["amount"])
+                writer.writerow([day, r["description"], debit, credit, r["category"]])
+        
+        tracker = FinanceTracker(os.path.join(tmp, "ledger.json"), journal=True)
+        stats = StatementImporter(tracker).import_file(statement)
+        print(f"import  {stats['imported']:8d} rows  {stats['seconds']:6.2f} s  "
+              f"{stats['rows_per_second']:10.0f} rows/s")
+
+
+def bench_fsync(rows: int):
+    """Compare journaled insert throughput under different fsync policies."""
+    data = list(sample_rows(rows))
+    policies = [("every write", FsyncPolicy()), ("every 100 writes", FsyncPolicy(100)),
+                ("every 1 second", FsyncPolicy(0, 1.0)), ("never", FsyncPolicy(0))]
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (label, policy) in enumerate(policies):
+            tracker = FinanceTracker(os.path.join(tmp, f"ledger{i}.json"), journal=True,
+                                     fsync_policy=policy)
+            start = time.perf_counter()
+            for r in data:
+                tracker.add_transaction(**r)
+            policy.flush()
+            elapsed = time.perf_counter() - start
+            print(f"{label:18s} {rows:8d} rows  {rows / elapsed:10.0f} rows/s")
+
+
+def bench_write_behind(rows: int):
+    """Compare saving after every goal update with a single deferred save."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = FinanceTracker(os.path.join(tmp, "ledger.json"))
+        for label, write_behind in (("save every update", False), ("batch", True)):
+            goals = GoalTracker(tracker, os.path.join(tmp, f"goals_{write_behind}.json"))
+            with goals.batch():
+                for i in range(1000):
+                    goals.create_goal(f"Goal {i}", 1000, "2030-01-01", "Savings", "")
+            start = time.perf_counter()
+            if write_behind:
+                with goals.batch():
+                    for i in range(rows):
+                        goals.update_goal_progress(f"Goal {i % 1000}", 1)
+            else:
+                for i in range(rows):
+                    goals.update_goal_progress(f"Goal {i % 1000}", 1)
+            elapsed = time.perf_counter() - start
+            print(f"{label:18s} {rows:8d} updates  {rows / elapsed:10.0f} updates/s")
+
+
+def bench_startup(rows: int):
+    """Compare cold start from the JSON data file and from the binary snapshot."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "ledger.json")
+        FinanceTracker(data_file, binary_snapshot=True).add_transactions(sample_rows(rows))
+        for label, options in (("JSON", {}), ("binary snapshot", {"binary_snapshot": True})):
+            tracker = None  # free the previous ledger outside the timed section
+            start = time.perf_counter()
+            tracker = FinanceTracker(data_file, **options)
+            tracker.get_balance()
+            elapsed = time.perf_counter() - start
+            print(f"{label:16s} {rows:8d} rows  {elapsed * 1000:10.1f} ms")
+
+
+def bench_analysis(rows: int):
+    """Compare analysis over in-memory objects with analysis over mapped columns."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "ledger.json")
+        FinanceTracker(data_file, binary_snapshot=True).add_transactions(sample_rows(rows))
+        for label, options in (("objects", {}), ("memory-mapped", {"binary_snapshot": True})):
+            def run():
+                analysis = FinancialAnalysis(FinanceTracker(data_file, **options))
+                for year in (2023, 2024, 2025):
+                    analysis.monthly_income_vs_expenses(year)
+            
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            # Timed without tracemalloc, which slows object creation down a lot
+            print(f"{label:14s} {rows:8d} rows  {elapsed:8.2f} s  {peak_memory(run) / 1e6:8.1f} MB peak")
+
+
+def bench_query_cache(rows: int):
+    """Time repeated report menu visits with the query cache cold, warm and after a new transaction."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = FinanceTracker(os.path.join(tmp, "ledger.json"), journal=True)
+        tracker.add_transactions(sample_rows(rows))
+        planner = BudgetPlanner(tracker, os.path.join(tmp, "budgets.json"))
+        for category in CATEGORIES:
+            planner.create_budget(category, 1000, "monthly", "2023-01-01")
+        analysis = FinancialAnalysis(tracker)
+        
+        def visit():
+            for month in range(1, 13):
+                tracker.generate_monthly_report(2024, month)
+                planner.calculate_budget_status(2024, month)
+            analysis.monthly_income_vs_expenses(2024)
+            analysis.category_trend_analysis("Rent", 36)
+            analysis.savings_rate_analysis(36)
+        
+        steps = [("cold", None), ("warm", None),
+                 ("new transaction today", datetime.date.today().isoformat()),
+                 ("back-dated to 2024-03", "2024-03-15")]
+        for label, date in steps:
+            if date is not None:
+                tracker.add_transaction(10, "Rent", "Benchmark", date)
+            start = time.perf_counter()
+            visit()
+            elapsed = time.perf_counter() - start
+            print(f"{label:24s} {elapsed * 1000:10.2f} ms")
+
+
+def bench_budgets(rows: int):
+    """Time budget statuses for every period: first evaluation, then after each new transaction."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = FinanceTracker(os.path.join(tmp, "ledger.json"), journal=True)
+        tracker.add_transactions(sample_rows(rows))
+        planner = BudgetPlanner(tracker, os.path.join(tmp, "budgets.json"))
+        with planner.batch():
+            for category in CATEGORIES:
+                for period in ("weekly", "monthly", "quarterly", "yearly"):
+                    planner.create_budget(category, 1000, period, "2023-01-01")
+                planner.create_budget(category, 1000, "custom", "2023-01-01", "2025-12-31")
+        on = datetime.date(2025, 6, 15)
+        
+        start = time.perf_counter()
+        planner.calculate_budget_status(on=on)
+        print(f"first evaluation      {len(planner.budgets):4d} budgets  {(time.perf_counter() - start) * 1000:8.2f} ms")
+        
+        updates = 1000
+        start = time.perf_counter()
+        for i in range(updates):
+            tracker.add_transaction(10, CATEGORIES[i % len(CATEGORIES)], "Benchmark", "2025-06-14")
+            planner.calculate_budget_status(on=on)
+        elapsed = time.perf_counter() - start
+        print(f"add + evaluate        {updates:4d} times    {elapsed / updates * 1000:8.2f} ms each")
+
+
+def bench_alerts(rows: int):
+    """Compare add_transaction throughput with and without budget alerting."""
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "ledger.json")
+        FinanceTracker(data_file).add_transactions(sample_rows(rows))
+        today = datetime.date.today().isoformat()
+        posts = 20000
+        for label, alerting in (("no budgets", False), ("35 budgets + alerts", True)):
+            # Write-behind, so the numbers show the in-memory cost of posting
+            tracker = FinanceTracker(data_file, write_behind=True)
+            if alerting:
+                planner = BudgetPlanner(tracker, os.path.join(tmp, "budgets.json"))
+                with planner.batch():
+                    for category in CATEGORIES:
+                        for period in ("weekly", "monthly", "quarterly", "yearly"):
+                            planner.create_budget(category, 1000, period, "2023-01-01")
+                        planner.create_budget(category, 1000, "custom", "2023-01-01", "2030-12-31")
+                alerts = []
+                planner.subscribe(alerts.append)
+                tracker.add_transaction(1, "Rent", "Seed", today)  # seeds the running totals
+            start = time.perf_counter()
+            for i in range(posts):
+                tracker.add_transaction(5, CATEGORIES[i % len(CATEGORIES)], "Benchmark", today)
+            elapsed = time.perf_counter() - start
+            print(f"{label:20s} {posts / elapsed:10.0f} transactions/s")
+
+
+def bench_lookups(rows: int):
+    """Time lookups and updates by key on thousands of budgets, goals and investments."""
+    count = 10000
+    with tempfile.TemporaryDirectory() as tmp:
+        tracker = FinanceTracker(os.path.join(tmp, "ledger.json"))
+        planner = BudgetPlanner(tracker, os.path.join(tmp, "budgets.json"), write_behind=True)
+        goals = GoalTracker(tracker, os.path.join(tmp, "goals.json"), write_behind=True)
+        investments = InvestmentTracker(os.path.join(tmp, "investments.json"), write_behind=True)
+        
+        start = time.perf_counter()
+        for i in range(count):
+            planner.create_budget(f"Category {i}", 100, "monthly", "2024-01-01")
+            goals.create_goal(f"Goal {i}", 1000, "2030-01-01", f"Group {i % 50}", "")
+            investments.add_investment(f"TICK{i}", f"Type {i % 20}", "2024-01-01", 10, 1, 10)
+        print(f"create 3 x {count} records          {(time.perf_counter() - start) * 1000:10.1f} ms")
+        
+        start = time.perf_counter()
+        for i in range(count):
+            planner.get_budget(f"Category {i}")
+            goals.update_goal_progress(f"Goal {i}", 1)
+            investments.update_investment_price(f"TICK{i}", 11)
+        print(f"look up / update 3 x {count} records {(time.perf_counter() - start) * 1000:10.1f} ms")
+        
+        # The linear scans the lookups used to do, for comparison
+        start = time.perf_counter()
+        for i in range(count // 100):
+            name = f"Goal {i * 100}"
+            next(g for g in goals.goals if g.name == name)
+        elapsed = (time.perf_counter() - start) * 100
+        print(f"linear scan, 1 x {count} goals        {elapsed * 1000:10.1f} ms (extrapolated)")
+
+
+def bench_prices(rows: int):
+    """Compare a nightly price refresh done per holding with one update_prices call."""
+    holdings = 5000
+    rng = random.Random(0)
+    prices = {f"TICK{i}": round(rng.uniform(1, 500), 2) for i in range(holdings)}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, bulk in (("update_investment_price", False), ("update_prices", True)):
+            investments = InvestmentTracker(os.path.join(tmp, f"investments_{bulk}.json"))
+            with investments.batch():
+                for i in range(holdings):
+                    investments.add_investment(f"TICK{i}", f"Type {i % 20}", "2024-01-01", 10, 1 + i % 7, 10)
+            # Each single update rewrites the file, so the loop only runs on the first 500 holdings
+            updates = dict(list(prices.items())[:500]) if not bulk else prices
+            start = time.perf_counter()
+            if bulk:
+                investments.update_prices(updates)
+            else:
+                for name, price in updates.items():
+                    investments.update_investment_price(name, price)
+            investments.get_portfolio_value()
+            investments.get_portfolio_profit_loss()
+            investments.get_portfolio_allocation()
+            elapsed = time.perf_counter() - start
+            print(f"{label:24s} {len(updates):6d} prices  {elapsed * 1000:10.1f} ms  "
+                  f"{len(updates) / elapsed:10.0f} prices/s")
+
+
+def bench_price_history(rows: int):
+    """Record years of nightly prices for thousands of holdings, then query the history."""
+    holdings = 2000
+    days = 5 * 261  # five years of weekdays
+    rng = random.Random(0)
+    names = [f"TICK{i}" for i in range(holdings)]
+    with tempfile.TemporaryDirectory() as tmp:
+        investments = InvestmentTracker(os.path.join(tmp, "investments.json"), write_behind=True,
+                                        fsync_policy=FsyncPolicy(every_writes=0), price_history=True)
+        with investments.batch():
+            for i, name in enumerate(names):
+                investments.add_investment(name, f"Type {i % 20}", "2020-01-01", 100, 1 + i % 7, 100)
+        
+        prices = [100.0] * holdings
+        day = datetime.date(2020, 1, 1)
+        start = time.perf_counter()
+        for _ in range(days):
+            day += datetime.timedelta(days=3 if day.weekday() == 4 else 1)
+            prices = [p * (1 + rng.gauss(0.0003, 0.02)) for p in prices]
+            investments.update_prices(dict(zip(names, prices)), day.isoformat())
+        elapsed = time.perf_counter() - start
+        history = investments.price_history
+        count = history.rows + history.journal_entries
+        print(f"record {days} nights x {holdings} prices  {elapsed:8.1f} s  "
+              f"{elapsed / days * 1000:8.1f} ms/night")
+        size = sum(os.path.getsize(os.path.join(history.directory, f)) for f in os.listdir(history.directory))
+        print(f"on disk {count:,} prices          {size / 2 ** 20:8.1f} MB  {size / count:8.1f} bytes/price")
+        
+        start = time.perf_counter()
+        investments._price_history = None
+        dates, values = investments.price_history.history("TICK1234", "2023-01-01", "2023-12-31")
+        print(f"reopen + one year of one holding   {(time.perf_counter() - start) * 1000:8.1f} ms "
+              f"({len(dates)} prices)")
+        
+        start = time.perf_counter()
+        performance = investments.portfolio_performance(end=day.isoformat())
+        print(f"portfolio performance, all history {(time.perf_counter() - start) * 1000:8.1f} ms "
+              f"(TWR {performance['time_weighted_return']:.1f}%, "
+              f"volatility {performance['volatility']:.1f}%, "
+              f"drawdown {performance['max_drawdown']:.1f}%)")
+        
+        # The same prices kept as JSON Lines only, for comparison
+        path = os.path.join(tmp, "prices.jsonl")
+        with open(path, 'w') as f:
+            for name in names:
+                for date, price in zip(*investments.price_history.history(name)):
+                    f.write(json.dumps({"name": name, "date": str(date), "price": float(price)}) + "\n")
+        start = time.perf_counter()
+        with open(path, 'r') as f:
+            found = [r for r in map(json.loads, f)
+                     if r["name"] == "TICK1234" and "2023-01-01" <= r["date"] <= "2023-12-31"]
+        print(f"JSON Lines scan, one holding       {(time.perf_counter() - start) * 1000:8.1f} ms "
+              f"({len(found)} prices, {os.path.getsize(path) / 2 ** 20:.1f} MB)")
+
+
+STARTUP_BUDGET_MS = 100
+
+ADD_TRANSACTION_SCRIPT = """
+import sys
+from finance_tracker import FinanceTracker
+FinanceTracker(sys.argv[1], journal=True).add_transaction(12.5, "Groceries", "Milk")
+"""
+
+
+def bench_importtime(rows: int):
+    """Measure how long importing main.py and adding one transaction take."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                            cwd=here, capture_output=True, text=True, check=True)
+    # Lines look like "import time: self [us] | cumulative | imported package"
+    modules = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            modules.append((int(parts[1]), parts[2].rstrip()))
+    import_ms = max(cumulative for cumulative, _ in modules) / 1000
+    print(f"import main        {import_ms:8.1f} ms")
+    for cumulative, name in sorted(modules, reverse=True)[1:6]:
+        print(f"  {name:30s} {cumulative / 1000:8.1f} ms")
+    
+    heavy = subprocess.run([sys.executable, "-c", "import sys, main; "
+                            "print(' '.join(m for m in ('numpy', 'matplotlib') if m in sys.modules))"],
+                           cwd=here, capture_output=True, text=True, check=True).stdout.strip()
+    print(f"heavy modules loaded: {heavy or 'none'}")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", ADD_TRANSACTION_SCRIPT, os.path.join(tmp, "ledger.json")],
+                       cwd=here, check=True)
+        add_ms = (time.perf_counter() - start) * 1000
+    print(f"add transaction   {add_ms:8.1f} ms (whole process)")
+    
+    if max(import_ms, add_ms) > STARTUP_BUDGET_MS:
+        print(f"Over the {STARTUP_BUDGET_MS} ms startup budget.")
+        sys.exit(1)
+
+
+BENCHMARKS = {
+    "memory": bench_memory,
+    "insert": bench_insert,
+    "import": bench_import,
+    "fsync": bench_fsync,
+    "writebehind": bench_write_behind,
+    "startup": bench_startup,
+    "analysis": bench_analysis,
+    "querycache": bench_query_cache,
+    "budgets": bench_budgets,
+    "alerts": bench_alerts,
+    "lookups": bench_lookups,
+    "prices": bench_prices,
+    "pricehistory": bench_price_history,
+    "importtime": bench_importtime,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Finance manager benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS))
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+    BENCHMARKS[args.name](args.rows)
@@ -0,0 +1,207 @@
+"""
+Budget Engine Module
+
+This module evaluates budgets over their period windows: weekly (seven days
+from the budget's start date), calendar monthly, quarterly and yearly, or a
+custom start to end date range. Windows are clipped to the budget's start and
+end dates.
+
+Spending is aggregated once per distinct window, by category, from the
+ledger's date index; every budget sharing that window reads the same totals.
+The totals are kept and updated from the transactions added since (see
+``FinanceTracker.changes_since``), so new transactions only touch the
+windows they fall in.
+
+BudgetMonitor keeps a running total for every budget's current window and
+raises a BudgetAlert whenever a new transaction pushes a budget past one of
+its thresholds.
+"""
+import datetime
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, List, Optional, Sequence, Tuple
+from finance_tracker import FinanceTracker, month_bounds, parse_date
+
+BUDGET_PERIODS = ["weekly", "monthly", "quarterly", "yearly", "custom"]
+
+Window = Tuple[datetime.date, datetime.date]
+
+
+def period_window(period: str, on: datetime.date, anchor: datetime.date) -> Optional[Window]:
+    """Get the window of a budget period containing a date, or None for an unknown period."""
+    if period == "weekly":
+        start = on - datetime.timedelta(days=(on - anchor).days % 7)
+        return start, start + datetime.timedelta(days=6)
+    if period == "monthly":
+        return month_bounds(on.year, on.month)
+    if period == "quarterly":
+        first_month = (on.month - 1) // 3 * 3 + 1
+        return month_bounds(on.year, first_month)[0], month_bounds(on.year, first_month + 2)[1]
+    if period == "yearly":
+        return datetime.date(on.year, 1, 1), datetime.date(on.year, 12, 31)
+    return None
+
+
+def budget_window(budget, on: datetime.date) -> Optional[Window]:
+    """Get the window a budget is measured over on a date, clipped to its start and end dates.
+
+    Returns None for an unknown period or when the clipped window is empty.
+    """
+    start_date = parse_date(budget.start_date)
+    end_date = parse_date(budget.end_date) if budget.end_date else datetime.date.max
+    if budget.period == "custom":
+        window = (start_date, end_date)
+    else:
+        window = period_window(budget.period, on, start_date)
+        if window is None:
+            return None
+        window = (max(window[0], start_date), min(window[1], end_date))
+    if window[0] > window[1]:
+        return None
+    return window
+
+
+class BudgetEngine:
+    """Evaluate budgets against per-window spending totals, kept up to date incrementally."""
+
+    def __init__(self, finance_tracker: FinanceTracker, max_windows: int = 256):
+        """Initialize the engine with no windows aggregated yet."""
+        self.finance_tracker = finance_tracker
+        self.max_windows = max_windows
+        self._windows: "OrderedDict[Window, Dict[str, float]]" = OrderedDict()
+        self._version = finance_tracker.version
+
+    def _refresh(self):
+        """Fold the transactions added since the last evaluation into the cached windows."""
+        self._version, changes = self.finance_tracker.changes_since(self._version)
+        if changes is None:
+            self._windows.clear()
+        else:
+            for t in changes:
+                if t.transaction_type != "expense":
+                    continue
+                for (start, end), spending in self._windows.items():
+                    if start <= t.parsed_date <= end:
+                        spending[t.category] = spending.get(t.category, 0) + t.amount
+
+    def spending(self, window: Window) -> Dict[str, float]:
+        """Get spending by category over a window, aggregating it on first use."""
+        self._refresh()
+        spending = self._windows.get(window)
+        if spending is None:
+            spending = self._windows[window] = self.finance_tracker.get_spending_between(*window)
+            while len(self._windows) > self.max_windows:
+                self._windows.popitem(last=False)
+        else:
+            self._windows.move_to_end(window)
+        return spending
+
+    def evaluate(self, budgets: List, on: datetime.date,
+                 view: Optional[Window] = None) -> Dict[str, Dict]:
+        """Get the status of every budget active on a date.
+
+        A budget is active when its window has started by ``on`` and overlaps
+        ``view`` (by default just ``on``). Monthly budgets are keyed by their
+        category and the others by "category (period)".
+        """
+        if view is None:
+            view = (on, on)
+
+        status = {}
+        for budget in budgets:
+            window = budget_window(budget, on)
+            if window is None or window[0] > on or window[1] < view[0] or window[0] > view[1]:
+                continue
+            spent = self.spending(window).get(budget.category, 0)
+            key = budget.category if budget.period == "monthly" else f"{budget.category} ({budget.period})"
+            status[key] = {
+                "budget": budget.amount,
+                "spent": spent,
+                "remaining": budget.amount - spent,
+                "percentage": (spent / budget.amount) * 100 if budget.amount > 0 else 0,
+                "period": budget.period,
+                "start": window[0].isoformat(),
+                "end": window[1].isoformat()
+            }
+        return status
+
+
+@dataclass
+class BudgetAlert:
+    """A budget crossing one of its alert thresholds."""
+    category: str
+    period: str
+    threshold: float
+    budget: float
+    spent: float
+    start: str
+    end: str
+
+    @property
+    def percentage(self) -> float:
+        """Spending as a percentage of the budget."""
+        return (self.spent / self.budget) * 100
+
+    def to_dict(self):
+        """Convert alert to dictionary."""
+        return asdict(self)
+
+
+class BudgetMonitor:
+    """Keep running totals of the budgets' current windows and report threshold crossings.
+
+    Each new expense touches only the budgets of its category, so observing a
+    transaction is O(1) in the size of the ledger. The totals are seeded from
+    the engine and seeded again when the budgets change, the day moves to a
+    new window, or a batch was missed (for example after a reload).
+    """
+
+    def __init__(self, engine: BudgetEngine, thresholds: Sequence[float] = (80, 100)):
+        """Initialize the monitor; totals are seeded on the first transaction."""
+        self.engine = engine
+        self.thresholds = sorted(thresholds)
+        self._totals: Optional[Dict[str, List[list]]] = None
+        self._version = None
+        self._day = None
+
+    def reset(self):
+        """Drop the running totals, e.g. after the budgets changed."""
+        self._totals = None
+
+    def _seed(self, budgets: List, today: datetime.date, pending: List):
+        """Seed the running totals as they were before the ``pending`` transactions."""
+        self._totals = {}
+        for budget in budgets:
+            window = budget_window(budget, today)
+            if window is None or window[0] > today or budget.amount <= 0:
+                continue
+            spent = self.engine.spending(window).get(budget.category, 0)
+            for t in pending:
+                if (t.transaction_type == "expense" and t.category == budget.category
+                        and window[0] <= t.parsed_date <= window[1]):
+                    spent -= t.amount
+            self._totals.setdefault(budget.category, []).append([budget, window, spent])
+        self._day = today
+
+    def observe(self, budgets: List, transactions: List) -> List[BudgetAlert]:
+        """Add a batch of new transactions to the running totals, returning the thresholds crossed."""
+        version = self.engine.finance_tracker.version
+        today = datetime.date.today()
+        if self._totals is None or self._version != version - 1 or self._day != today:
+            self._seed(budgets, today, transactions)
+        self._version = version
+
+        alerts = []
+        for t in transactions:
+            if t.transaction_type != "expense":
+                continue
+            for total in self._totals.get(t.category, ()):
+                budget, (start, end), spent = total
+                if not start <= t.parsed_date <= end:
+                    continue
+                total[2] = spent + t.amount
+                for threshold in self.thresholds:
+                    if spent * 100 < threshold * budget.amount <= total[2] * 100:
+                        alerts.append(BudgetAlert(budget.category, budget.period, threshold, budget.amount,
+                                                  total[2], start.isoformat(), end.isoformat()))
+        return alerts
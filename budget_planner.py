@@ -7,8 +7,11 @@ import json
 import os
 import datetime
 from dataclasses import dataclass, asdict
-from typing import Dict, List, Optional
-from finance_tracker import FinanceTracker
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from finance_tracker import FinanceTracker, month_bounds, parse_date
+from storage import Storage, FsyncPolicy, atomic_write
+from persistence import WriteBehind, ReadOnlyView
+from budget_engine import BudgetEngine, BudgetMonitor, BudgetAlert, BUDGET_PERIODS
 
 
 @dataclass
@@ -16,7 +19,7 @@ class Budget:
     """Represents a budget for a specific category."""
     category: str
     amount: float
-    period: str  # "monthly", "weekly", etc.
+    period: str  # one of BUDGET_PERIODS
     start_date: str
     end_date: Optional[str] = None
     
@@ -25,18 +28,65 @@ class Budget:
         return asdict(self)
 
 
-class BudgetPlanner:
+class BudgetPlanner(WriteBehind):
     """Class for planning and tracking budgets."""
     
-    def __init__(self, finance_tracker: FinanceTracker, budget_file="budgets.json"):
-        """Initialize the budget planner."""
+    def __init__(self, finance_tracker: FinanceTracker, budget_file="budgets.json",
+                 storage: Optional[Storage] = None,
+                 fsync_policy: Optional[FsyncPolicy] = None, write_behind: bool = False,
+                 alert_thresholds: Sequence[float] = (80, 100)):
+        """Initialize the budget planner.
+        
+        With ``write_behind=True`` changes are only saved by ``flush()``.
+        
+        The planner watches the tracker's new transactions; whenever one
+        pushes a budget past one of ``alert_thresholds`` (percentages of the
+        budget), listeners registered with ``subscribe()`` get a BudgetAlert.
+        """
         self.finance_tracker = finance_tracker
         self.budget_file = budget_file
+        self.storage = storage
+        self.fsync_policy = fsync_policy
+        self._init_write_behind(write_behind)
+        self.engine = BudgetEngine(finance_tracker)
+        self.monitor = BudgetMonitor(self.engine, alert_thresholds)
+        self._alert_listeners: List[Callable[[BudgetAlert], None]] = []
         self.budgets = []
         self.load_budgets()
+        finance_tracker.subscribe(self._on_transactions)
+    
+    @property
+    def budgets(self) -> ReadOnlyView:
+        """All budgets, least recently created first (a read-only view; see create_budget)."""
+        return ReadOnlyView(self._budgets.values())
+    
+    @budgets.setter
+    def budgets(self, value: Iterable[Budget]):
+        # Indexed by (category, period), which identifies a budget
+        self._budgets: Dict[Tuple[str, str], Budget] = {}
+        for budget in value:
+            self._budgets.pop((budget.category, budget.period), None)
+            self._budgets[(budget.category, budget.period)] = budget
+    
+    def subscribe(self, listener: Callable[[BudgetAlert], None]):
+        """Call ``listener`` with every budget alert."""
+        self._alert_listeners.append(listener)
+    
+    def _on_transactions(self, transactions):
+        """Update the running budget totals with new transactions and send any alerts."""
+        if not self._alert_listeners:
+            return
+        for alert in self.monitor.observe(self._budgets.values(), transactions):
+            for listener in self._alert_listeners:
+                listener(alert)
     
     def load_budgets(self):
         """Load budget data from file."""
+        self.monitor.reset()
+        if self.storage is not None:
+            self.budgets = [Budget(**b) for b in self.storage.load_records("budgets")]
+            return
+        
         if os.path.exists(self.budget_file):
             try:
                 with open(self.budget_file, 'r') as f:
@@ -50,14 +100,30 @@ class BudgetPlanner:
     
     def save_budgets(self):
         """Save budget data to file."""
-        with open(self.budget_file, 'w') as f:
+        if self.storage is not None:
+            self.storage.replace_records("budgets", [b.to_dict() for b in self.budgets])
+            return
+        
+        with atomic_write(self.budget_file, self.fsync_policy) as f:
             json.dump([b.to_dict() for b in self.budgets], f, indent=2)
     
+    def _save(self):
+        """Save budgets (see WriteBehind)."""
+        self.save_budgets()
+    
     def create_budget(self, category: str, amount: float, period: str, 
                      start_date: Optional[str] = None, end_date: Optional[str] = None):
-        """Create a new budget."""
+        """Create a new budget; custom budgets need an end date."""
+        if period not in BUDGET_PERIODS:
+            raise ValueError(f"Unknown budget period: {period!r}")
+        if period == "custom" and not end_date:
+            raise ValueError("A custom budget needs an end date")
         if start_date is None:
             start_date = datetime.datetime.now().strftime("%Y-%m-%d")
+        # Malformed dates raise ValueError here rather than when the budget is evaluated
+        parse_date(start_date)
+        if end_date:
+            parse_date(end_date)
         
         budget = Budget(
             category=category,
@@ -67,63 +133,37 @@ class BudgetPlanner:
             end_date=end_date
         )
         
-        # Remove any existing budget for the same category and period
-        self.budgets = [b for b in self.budgets if not (b.category == category and b.period == period)]
-        
-        self.budgets.append(budget)
-        self.save_budgets()
+        # Replace any existing budget for the same category and period
+        self._budgets.pop((category, period), None)
+        self._budgets[(category, period)] = budget
+        self.monitor.reset()
+        self._changed()
         return budget
     
     def get_budget(self, category: str, period: str = "monthly"):
         """Get budget for a specific category and period."""
-        for budget in self.budgets:
-            if budget.category == category and budget.period == period:
-                return budget
-        return None
+        return self._budgets.get((category, period))
     
     def get_all_budgets(self):
-        """Get all budgets."""
+        """Get all budgets (a read-only view)."""
         return self.budgets
     
-    def calculate_budget_status(self, year=None, month=None):
-        """Calculate budget status for the current month."""
-        if year is None or month is None:
-            now = datetime.datetime.now()
-            year = now.year
-            month = now.month
-        
-        # Get monthly spending by category
-        monthly_transactions = [
-            t for t in self.finance_tracker.transactions 
-            if t.transaction_type == "expense"
-            and datetime.datetime.strptime(t.date, "%Y-%m-%d").year == year
-            and datetime.datetime.strptime(t.date, "%Y-%m-%d").month == month
-        ]
-        
-        spending_by_category = {}
-        for t in monthly_transactions:
-            if t.category not in spending_by_category:
-                spending_by_category[t.category] = 0
-            spending_by_category[t.category] += t.amount
+    def calculate_budget_status(self, year=None, month=None, on: Optional[datetime.date] = None):
+        """Calculate the status of the budgets active in a month (the current month by default).
         
-        # Compare with budgets
-        budget_status = {}
-        for budget in self.budgets:
-            if budget.period == "monthly":
-                category = budget.category
-                budget_amount = budget.amount
-                spent = spending_by_category.get(category, 0)
-                remaining = budget_amount - spent
-                percentage = (spent / budget_amount) * 100 if budget_amount > 0 else 0
-                
-                budget_status[category] = {
-                    "budget": budget_amount,
-                    "spent": spent,
-                    "remaining": remaining,
-                    "percentage": percentage
-                }
-        
-        return budget_status
+        Each budget is measured over its period window containing ``on``:
+        today for the current month, otherwise the month's last day. Monthly
+        budgets are keyed by category, the others by "category (period)".
+        """
+        if on is None:
+            today = datetime.date.today()
+            if year is None or month is None:
+                year, month = today.year, today.month
+            view = month_bounds(year, month)
+            on = today if view[0] <= today <= view[1] else view[1]
+        else:
+            view = (on, on)
+        return self.engine.evaluate(self._budgets.values(), on, view)
 
 
 def main():
@@ -153,8 +193,13 @@ def main():
         if choice == '1':
             category = input("Enter category: ")
             amount = float(input("Enter budget amount: Rs"))
-            period = input("Enter period (monthly/weekly): ")
-            planner.create_budget(category, amount, period)
+            period = input(f"Enter period ({'/'.join(BUDGET_PERIODS)}): ")
+            end_date = input("Enter end date (YYYY-MM-DD): ") if period == "custom" else None
+            try:
+                planner.create_budget(category, amount, period, end_date=end_date)
+            except ValueError as e:
+                print(f"{e}.")
+                continue
             print(f"Budget for {category} created successfully!")
             
         elif choice == '2':
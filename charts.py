@@ -0,0 +1,221 @@
+"""
+Charts Module
+
+This module renders charts with matplotlib's non-interactive Agg backend in a
+worker process, so drawing a chart and writing the PNG never blocks the menus.
+Rendered charts are cached under a hash of their data: asking again for a
+chart whose data has not changed copies the cached file at once.
+"""
+import os
+import json
+import shutil
+import hashlib
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+CACHE_DIR = ".chart_cache"
+
+# Bump when the drawing code changes, so that old cached charts are not reused
+CHART_VERSION = 1
+
+
+def chart_key(kind: str, data: Dict) -> str:
+    """Hash a chart's kind and data."""
+    text = json.dumps([CHART_VERSION, kind, data], sort_keys=True)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def draw_pie(plt, data: Dict):
+    """Draw a pie chart of ``values`` labelled by ``labels``."""
+    plt.figure(figsize=(10, 7))
+    plt.pie(data["values"], labels=data["labels"], autopct='%1.1f%%')
+    plt.title(data["title"])
+    plt.axis('equal')
+
+
+def draw_income_vs_expenses(plt, data: Dict):
+    """Draw monthly income and expense bars annotated with the net amount."""
+    import numpy as np
+
+    months = data["months"]
+    income = data["income"]
+    expenses = data["expenses"]
+
+    x = np.arange(len(months))
+    width = 0.35
+
+    fig, ax = plt.subplots(figsize=(12, 6))
+    ax.bar(x - width/2, income, width, label='Income')
+    ax.bar(x + width/2, expenses, width, label='Expenses')
+
+    ax.set_title(data["title"])
+    ax.set_xlabel('Month')
+    ax.set_ylabel('Amount (Rs)')
+    ax.set_xticks(x)
+    ax.set_xticklabels(months)
+    ax.legend()
+
+    # Add net savings/deficit
+    for i in range(len(months)):
+        net = income[i] - expenses[i]
+        color = 'green' if net >= 0 else 'red'
+        ax.annotate(f'Rs{net:.0f}',
+                    xy=(i, max(income[i], expenses[i]) + 50),
+                    ha='center', va='bottom',
+                    color=color)
+    plt.tight_layout()
+
+
+def draw_line(plt, data: Dict):
+    """Draw a monthly line chart, with an optional horizontal target line."""
+    plt.figure(figsize=(10, 6))
+    plt.plot(data["months"], data["values"], marker='o', linestyle='-')
+    plt.title(data["title"])
+    plt.xlabel('Month')
+    plt.ylabel(data["ylabel"])
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.xticks(rotation=45)
+    if data.get("target") is not None:
+        plt.axhline(y=data["target"], color='r', linestyle='--', alpha=0.7, label=data["target_label"])
+        plt.legend()
+    plt.tight_layout()
+
+
+DRAWERS: Dict[str, Callable] = {
+    "pie": draw_pie,
+    "income_vs_expenses": draw_income_vs_expenses,
+    "line": draw_line,
+}
+
+
+def render_chart(kind: str, data: Dict, path: str) -> str:
+    """Draw a chart and save it as a PNG; runs in the worker process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    DRAWERS[kind](plt, data)
+    # Saved aside and renamed, so a cached file is never half-written
+    temp_path = f"{path}.{os.getpid()}.png"
+    plt.savefig(temp_path)
+    plt.close('all')
+    os.replace(temp_path, path)
+    return path
+
+
+def render_pdf(charts: List[Tuple[str, Dict]], path: str) -> str:
+    """Draw charts as the pages of one PDF; runs in the worker process."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    temp_path = f"{path}.{os.getpid()}.pdf"
+    with PdfPages(temp_path) as pdf:
+        for kind, data in charts:
+            DRAWERS[kind](plt, data)
+            pdf.savefig()
+            plt.close('all')
+    os.replace(temp_path, path)
+    return path
+
+
+class ChartRenderer:
+    """Render charts in a background process, reusing cached charts for unchanged data."""
+
+    def __init__(self, cache_dir: str = CACHE_DIR, workers: int = 1, max_cached: int = 200):
+        """Initialize the renderer; the worker process starts on the first render."""
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.max_cached = max_cached
+        self._pool = None
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ProcessPoolExecutor:
+        """Get the worker pool, starting it if needed."""
+        if self._pool is None:
+            # Spawned rather than forked: the parent may be running a flusher thread
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def render(self, kind: str, data: Dict, path: str) -> Future:
+        """Render a chart to ``path`` in the background.
+
+        Returns a future that resolves to ``path`` once the file is written;
+        it is already done when the chart was cached.
+        """
+        key = chart_key(kind, data)
+        cached = os.path.join(self.cache_dir, key + ".png")
+        result = Future()
+
+        if os.path.exists(cached):
+            os.utime(cached)  # most recently used
+            shutil.copyfile(cached, path)
+            result.set_result(path)
+            return result
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with self._lock:
+            rendering = self._in_flight.get(key)
+            if rendering is None:
+                rendering = self._in_flight[key] = self._executor().submit(render_chart, kind, data, cached)
+
+        def copy(done: Future):
+            with self._lock:
+                self._in_flight.pop(key, None)
+            try:
+                done.result()
+                shutil.copyfile(cached, path)
+                self._prune()
+            except Exception as e:
+                result.set_exception(e)
+            else:
+                result.set_result(path)
+
+        rendering.add_done_callback(copy)
+        return result
+
+    def render_pdf(self, charts: List[Tuple[str, Dict]], path: str) -> Future:
+        """Render (kind, data) charts as a multi-page PDF in the background (not cached)."""
+        return self._executor().submit(render_pdf, charts, path)
+
+    def _prune(self):
+        """Remove the least recently used charts beyond ``max_cached``."""
+        entries = [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir)
+                   if name.endswith(".png")]
+        if len(entries) <= self.max_cached:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_cached]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker process, by default after the pending charts are written."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+
+_default_renderer: Optional[ChartRenderer] = None
+
+
+def default_renderer() -> ChartRenderer:
+    """Get the renderer shared by the visualize_* methods."""
+    global _default_renderer
+    if _default_renderer is None:
+        _default_renderer = ChartRenderer()
+    return _default_renderer
+
+
+def report_chart(future: Future, filename: str):
+    """Tell the user where a chart is, or will be, saved."""
+    if future.done():
+        print(f"Chart saved as '{filename}'")
+    else:
+        print(f"Rendering chart in the background; it will be saved as '{filename}'")
@@ -0,0 +1,280 @@
+"""
+Columnar Module
+
+This module keeps a column-oriented copy of the ledger in NumPy arrays so that
+analyses can use vectorized grouped reductions instead of Python loops. The
+columns can also be memory-mapped straight from a column file (see
+columnfile), without reading the ledger into Python objects at all.
+"""
+import os
+import datetime
+from typing import Dict, Iterable, List, Sequence, Tuple
+import numpy as np
+from aggregates import MonthlyAggregates
+from columnfile import ColumnReader, FILE_SUFFIX
+
+# datetime64[D] counts days from 1970-01-01, date.toordinal() from 0001-01-01
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+class ColumnarLedger:
+    """Transactions stored as NumPy columns.
+
+    Amounts are float64, dates datetime64[D], and categories and transaction
+    types are integer codes into the ``categories`` and ``types`` lists.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        """Initialize an empty ledger with room for ``capacity`` rows."""
+        self.size = 0
+        self._amount = np.empty(capacity, dtype=np.float64)
+        self._date = np.empty(capacity, dtype="datetime64[D]")
+        self._category = np.empty(capacity, dtype=np.int32)
+        self._type = np.empty(capacity, dtype=np.int32)
+        self.categories: List[str] = []
+        self.types: List[str] = []
+        self._category_codes: Dict[str, int] = {}
+        self._type_codes: Dict[str, int] = {}
+
+    @classmethod
+    def from_transactions(cls, transactions: Sequence) -> "ColumnarLedger":
+        """Build a ledger from a sequence of transactions."""
+        ledger = cls(capacity=max(len(transactions), 1024))
+        ledger.extend(transactions)
+        return ledger
+
+    @property
+    def amount(self) -> np.ndarray:
+        """Amounts of all rows."""
+        return self._amount[:self.size]
+
+    @property
+    def date(self) -> np.ndarray:
+        """Dates of all rows."""
+        return self._date[:self.size]
+
+    @property
+    def category(self) -> np.ndarray:
+        """Category codes of all rows."""
+        return self._category[:self.size]
+
+    @property
+    def type(self) -> np.ndarray:
+        """Transaction type codes of all rows."""
+        return self._type[:self.size]
+
+    def _code(self, value: str, codes: Dict[str, int], names: List[str]) -> int:
+        """Get the integer code of a string, assigning a new one if needed."""
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(names)
+            names.append(value)
+        return code
+
+    def _reserve(self, count: int):
+        """Grow the columns so that ``count`` more rows fit."""
+        needed = self.size + count
+        capacity = len(self._amount)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name in ("_amount", "_date", "_category", "_type"):
+            column = getattr(self, name)
+            grown = np.empty(capacity, dtype=column.dtype)
+            grown[:self.size] = column[:self.size]
+            setattr(self, name, grown)
+
+    def append(self, transaction):
+        """Append a single transaction."""
+        self._reserve(1)
+        i = self.size
+        self._amount[i] = transaction.amount
+        self._date[i] = transaction.ordinal - EPOCH_ORDINAL
+        self._category[i] = self._code(transaction.category, self._category_codes, self.categories)
+        self._type[i] = self._code(transaction.transaction_type, self._type_codes, self.types)
+        self.size += 1
+
+    def extend(self, transactions: Iterable):
+        """Append many transactions at once."""
+        transactions = list(transactions)
+        count = len(transactions)
+        self._reserve(count)
+        start, end = self.size, self.size + count
+        self._amount[start:end] = np.fromiter((t.amount for t in transactions), np.float64, count)
+        ordinals = np.fromiter((t.ordinal for t in transactions), np.int64, count)
+        self._date[start:end] = (ordinals - EPOCH_ORDINAL).astype("datetime64[D]")
+        self._category[start:end] = np.fromiter(
+            (self._code(t.category, self._category_codes, self.categories) for t in transactions),
+            np.int32, count)
+        self._type[start:end] = np.fromiter(
+            (self._code(t.transaction_type, self._type_codes, self.types) for t in transactions),
+            np.int32, count)
+        self.size = end
+
+    def _window(self, start_date: datetime.date, end_date: datetime.date) -> np.ndarray:
+        """Get a boolean mask of the rows dated from start to end (inclusive)."""
+        dates = self.date
+        return (dates >= np.datetime64(start_date, "D")) & (dates <= np.datetime64(end_date, "D"))
+
+    def _rows_between(self, start_date: datetime.date, end_date: datetime.date) -> Tuple[np.ndarray, ...]:
+        """Get the dates, type codes, category codes and amounts of the rows between two dates."""
+        mask = self._window(start_date, end_date)
+        return self.date[mask], self.type[mask], self.category[mask], self.amount[mask]
+
+    def monthly_aggregates(self, start_date: datetime.date, end_date: datetime.date) -> MonthlyAggregates:
+        """Bucket the rows between two dates by month, type and category."""
+        aggregates = MonthlyAggregates()
+        dates, types, categories, amounts = self._rows_between(start_date, end_date)
+        if not len(dates):
+            return aggregates
+
+        # Months since 1970-01, combined with type and category codes into a single group key
+        months = dates.astype("datetime64[M]").astype(np.int64)
+        types = types.astype(np.int64)
+        categories = categories.astype(np.int64)
+        type_keys = months * len(self.types) + types
+        category_keys = type_keys * len(self.categories) + categories
+
+        keys, groups = np.unique(type_keys, return_inverse=True)
+        for key, total in zip(keys.tolist(), np.bincount(groups, weights=amounts).tolist()):
+            month, type_code = divmod(key, len(self.types))
+            year, month = divmod(month, 12)
+            aggregates.by_type[(year + 1970, month + 1, self.types[type_code])] = total
+
+        keys, groups = np.unique(category_keys, return_inverse=True)
+        for key, total in zip(keys.tolist(), np.bincount(groups, weights=amounts).tolist()):
+            type_key, category_code = divmod(key, len(self.categories))
+            month, type_code = divmod(type_key, len(self.types))
+            year, month = divmod(month, 12)
+            aggregates.by_category[(year + 1970, month + 1, self.types[type_code],
+                                    self.categories[category_code])] = total
+
+        return aggregates
+
+
+class MappedColumnarLedger(ColumnarLedger):
+    """A ColumnarLedger whose rows are memory-mapped from a column file.
+
+    The mapped columns are read-only and never copied whole: queries only
+    copy the rows they select, and processes mapping the same file share
+    the operating system's page cache. Rows appended afterwards go to a
+    small in-memory ledger that shares the category and type codes.
+    """
+
+    def __init__(self, directory: str):
+        """Map the transaction columns of a column file directory."""
+        reader = ColumnReader(directory)
+        self.directory = directory
+        self.mapped_size = reader.rows
+        self.categories = list(reader.dictionaries["category"])
+        self.types = list(reader.dictionaries["transaction_type"])
+        self._category_codes = {name: code for code, name in enumerate(self.categories)}
+        self._type_codes = {name: code for code, name in enumerate(self.types)}
+        self._mapped_amount = self._map(reader, "amount", "<f8")
+        self._mapped_day = self._map(reader, "date", "<i4")
+        self._mapped_category = self._map(reader, "category", "<i4")
+        self._mapped_type = self._map(reader, "transaction_type", "<i4")
+        reader.close()
+
+        self.tail = ColumnarLedger()
+        self.tail.categories, self.tail._category_codes = self.categories, self._category_codes
+        self.tail.types, self.tail._type_codes = self.types, self._type_codes
+
+    def _map(self, reader: ColumnReader, name: str, dtype: str) -> np.ndarray:
+        """Memory-map one column file."""
+        if reader.rows == 0:
+            return np.empty(0, dtype=dtype)  # empty files cannot be mapped
+        path = os.path.join(self.directory, name + FILE_SUFFIX[dict(reader.schema)[name]])
+        return np.memmap(path, dtype=dtype, mode="r", shape=(reader.rows,))
+
+    @property
+    def size(self) -> int:
+        """Number of rows, mapped and appended."""
+        return self.mapped_size + self.tail.size
+
+    @property
+    def amount(self) -> np.ndarray:
+        """Amounts of all rows (a copy)."""
+        return np.concatenate([self._mapped_amount, self.tail.amount])
+
+    @property
+    def date(self) -> np.ndarray:
+        """Dates of all rows (a copy)."""
+        return np.concatenate([self._mapped_day.astype("datetime64[D]"), self.tail.date])
+
+    @property
+    def category(self) -> np.ndarray:
+        """Category codes of all rows (a copy)."""
+        return np.concatenate([self._mapped_category, self.tail.category])
+
+    @property
+    def type(self) -> np.ndarray:
+        """Transaction type codes of all rows (a copy)."""
+        return np.concatenate([self._mapped_type, self.tail.type])
+
+    def append(self, transaction):
+        """Append a single transaction."""
+        self.tail.append(transaction)
+
+    def extend(self, transactions: Iterable):
+        """Append many transactions at once."""
+        self.tail.extend(transactions)
+
+    def _rows_between(self, start_date: datetime.date, end_date: datetime.date) -> Tuple[np.ndarray, ...]:
+        """Get the dates, type codes, category codes and amounts of the rows between two dates."""
+        # Compare day numbers directly, so only the selected rows are converted to dates
+        days = self._mapped_day
+        mask = (days >= start_date.toordinal() - EPOCH_ORDINAL) & (days <= end_date.toordinal() - EPOCH_ORDINAL)
+        mapped = (days[mask].astype("datetime64[D]"), self._mapped_type[mask],
+                  self._mapped_category[mask], self._mapped_amount[mask])
+        if not self.tail.size:
+            return mapped
+        tail = self.tail._rows_between(start_date, end_date)
+        return tuple(np.concatenate(pair) for pair in zip(mapped, tail))
+
+
+class PortfolioColumns:
+    """Investment holdings stored as NumPy columns, for vectorized revaluation.
+
+    Rows follow the tracker's investment list; investment types are integer
+    codes into ``types`` and ``rows_by_name`` maps every name to its rows.
+    """
+
+    def __init__(self, investments: Sequence):
+        """Build the columns from a sequence of investments."""
+        self.quantity = np.array([inv.quantity for inv in investments], dtype=np.float64)
+        self.purchase_price = np.array([inv.purchase_price for inv in investments], dtype=np.float64)
+        self.current_price = np.array([inv.current_price for inv in investments], dtype=np.float64)
+        self.types: List[str] = []
+        type_codes: Dict[str, int] = {}
+        codes = []
+        self.rows_by_name: Dict[str, List[int]] = {}
+        for row, inv in enumerate(investments):
+            code = type_codes.get(inv.investment_type)
+            if code is None:
+                code = type_codes[inv.investment_type] = len(self.types)
+                self.types.append(inv.investment_type)
+            codes.append(code)
+            self.rows_by_name.setdefault(inv.name, []).append(row)
+        self.type = np.array(codes, dtype=np.int32)
+
+    def set_prices(self, rows: Sequence[int], prices: Sequence[float]):
+        """Set the current price of many rows at once."""
+        self.current_price[np.asarray(rows, dtype=np.intp)] = prices
+
+    def value(self) -> float:
+        """Get the total current value."""
+        return float(self.quantity @ self.current_price)
+
+    def profit_loss(self) -> float:
+        """Get the total profit or loss."""
+        return float(self.quantity @ (self.current_price - self.purchase_price))
+
+    def allocation(self) -> Dict[str, float]:
+        """Get each investment type's share of the current value, in percent."""
+        values = np.bincount(self.type, weights=self.quantity * self.current_price, minlength=len(self.types))
+        total = values.sum()
+        if total == 0:
+            return {}
+        return dict(zip(self.types, (values / total * 100).tolist()))
@@ -0,0 +1,280 @@
+"""
+Column File Module
+
+This module writes records into a directory of column files, similar in spirit
+to Parquet: every column is stored contiguously in its own file so it can be
+read (or memory-mapped) without touching the others.
+
+Column types:
+- ``float64``: little-endian doubles in ``<name>.f8``
+- ``date32``: days since 1970-01-01 as little-endian int32 in ``<name>.i4``,
+  with DATE_NULL for missing dates
+- ``dictionary``: int32 codes in ``<name>.i4`` indexing the column's
+  dictionary in ``_schema.json``
+- ``string``: UTF-8 text in ``<name>.txt`` with int64 end offsets in
+  ``<name>.i8``
+
+``_schema.json`` is written last and records the row count, column types,
+dictionaries and any metadata the writer was given. ColumnReader maps the
+files into memory and decodes rows only when they are read.
+"""
+import os
+import sys
+import json
+import mmap
+import datetime
+from array import array
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+DATE_NULL = -2 ** 31
+
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+SCHEMA_FILE = "_schema.json"
+
+TRANSACTION_SCHEMA = [("amount", "float64"), ("category", "dictionary"), ("description", "string"),
+                      ("date", "date32"), ("transaction_type", "dictionary")]
+
+BUDGET_SCHEMA = [("category", "dictionary"), ("amount", "float64"), ("period", "dictionary"),
+                 ("start_date", "date32"), ("end_date", "date32")]
+
+GOAL_SCHEMA = [("name", "string"), ("target_amount", "float64"), ("current_amount", "float64"),
+               ("deadline", "date32"), ("category", "dictionary"), ("description", "string")]
+
+INVESTMENT_SCHEMA = [("name", "string"), ("investment_type", "dictionary"), ("purchase_date", "date32"),
+                     ("purchase_price", "float64"), ("quantity", "float64"),
+                     ("current_price", "float64"), ("last_updated", "date32")]
+
+FILE_SUFFIX = {"float64": ".f8", "date32": ".i4", "dictionary": ".i4", "string": ".i8"}
+
+
+def parse_iso_date(value: str) -> datetime.date:
+    """Parse a YYYY-MM-DD string, also accepting unpadded months and days (2024-5-1)."""
+    if len(value) == 10 and value[4] == "-" and value[7] == "-":
+        return datetime.date.fromisoformat(value)
+    # The same format finance_tracker.parse_date accepts, only slower
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def iso_date(value: str) -> str:
+    """Get a YYYY-MM-DD string zero-padded, so that dates compare correctly as strings."""
+    return value if len(value) == 10 else parse_iso_date(value).isoformat()
+
+
+def date_to_days(value) -> int:
+    """Convert a YYYY-MM-DD string to days since 1970-01-01."""
+    if not value:
+        return DATE_NULL
+    return parse_iso_date(value).toordinal() - EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=65536)
+def days_to_date(days: int):
+    """Convert days since 1970-01-01 back to a YYYY-MM-DD string."""
+    if days == DATE_NULL:
+        return None
+    return datetime.date.fromordinal(days + EPOCH_ORDINAL).isoformat()
+
+
+def _little_endian(values: array) -> array:
+    """Get a little-endian copy of an array (a no-op on little-endian machines)."""
+    if sys.byteorder == "little":
+        return values
+    values = array(values.typecode, values)
+    values.byteswap()
+    return values
+
+
+class ColumnWriter:
+    """Write records into a column file directory, buffering a chunk at a time."""
+
+    def __init__(self, directory: str, schema: List[Tuple[str, str]], chunk_size: int = 65536):
+        """Create the directory and empty column files."""
+        self.directory = directory
+        self.schema = schema
+        self.chunk_size = chunk_size
+        self.rows = 0
+        self.meta: Dict[str, Any] = {}
+        self.dictionaries: Dict[str, Dict[str, int]] = {
+            name: {} for name, column_type in schema if column_type == "dictionary"
+        }
+        self._text_offsets = {name: 0 for name, column_type in schema if column_type == "string"}
+        os.makedirs(directory, exist_ok=True)
+        # Without a schema the directory reads as incomplete until close() rewrites it
+        if os.path.exists(os.path.join(directory, SCHEMA_FILE)):
+            os.remove(os.path.join(directory, SCHEMA_FILE))
+        for name, column_type in schema:
+            open(self._path(name, FILE_SUFFIX[column_type]), 'wb').close()
+            if column_type == "string":
+                open(self._path(name, ".txt"), 'wb').close()
+        self._reset_buffers()
+
+    def _path(self, name: str, suffix: str) -> str:
+        """Get the path of a column file."""
+        return os.path.join(self.directory, name + suffix)
+
+    def _reset_buffers(self):
+        """Start a new chunk."""
+        self._buffers = {}
+        self._text = {}
+        for name, column_type in self.schema:
+            self._buffers[name] = array({"float64": "d", "string": "q"}.get(column_type, "i"))
+            if column_type == "string":
+                self._text[name] = []
+        self._buffered = 0
+
+    def write(self, record: Dict):
+        """Append one record."""
+        for name, column_type in self.schema:
+            value = record[name]
+            if column_type == "float64":
+                self._buffers[name].append(float(value))
+            elif column_type == "date32":
+                self._buffers[name].append(date_to_days(value))
+            elif column_type == "dictionary":
+                codes = self.dictionaries[name]
+                code = codes.get(value)
+                if code is None:
+                    code = codes[value] = len(codes)
+                self._buffers[name].append(code)
+            else:
+                encoded = (value or "").encode("utf-8")
+                self._text_offsets[name] += len(encoded)
+                self._text[name].append(encoded)
+                self._buffers[name].append(self._text_offsets[name])
+        self._buffered += 1
+        if self._buffered >= self.chunk_size:
+            self.flush()
+
+    def write_all(self, records: Iterable[Dict]) -> int:
+        """Append records from an iterable, returning the number written."""
+        for record in records:
+            self.write(record)
+        return self.rows + self._buffered
+
+    def flush(self):
+        """Append the buffered chunk to the column files."""
+        for name, column_type in self.schema:
+            with open(self._path(name, FILE_SUFFIX[column_type]), 'ab') as f:
+                _little_endian(self._buffers[name]).tofile(f)
+            if column_type == "string":
+                with open(self._path(name, ".txt"), 'ab') as f:
+                    f.write(b"".join(self._text[name]))
+        self.rows += self._buffered
+        self._reset_buffers()
+
+    def close(self):
+        """Flush the last chunk and write the schema file."""
+        self.flush()
+        schema = {
+            "rows": self.rows,
+            "meta": self.meta,
+            "columns": [
+                {"name": name, "type": column_type,
+                 **({"dictionary": list(self.dictionaries[name])} if column_type == "dictionary" else {})}
+                for name, column_type in self.schema
+            ]
+        }
+        with open(os.path.join(self.directory, SCHEMA_FILE), 'w') as f:
+            json.dump(schema, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+
+
+TYPECODES = {"float64": "d", "date32": "i", "dictionary": "i", "string": "q"}
+
+
+class ColumnReader:
+    """Read a column file directory through memory maps.
+    
+    Opening a directory only reads ``_schema.json``; column files are mapped
+    on first use and rows are decoded only when iterated, so even a large
+    file opens in milliseconds and the operating system pages data in (and
+    shares it between processes) as needed.
+    """
+
+    def __init__(self, directory: str):
+        """Open a column file directory written by ColumnWriter."""
+        self.directory = directory
+        with open(os.path.join(directory, SCHEMA_FILE), 'r') as f:
+            schema = json.load(f)
+        self.rows: int = schema["rows"]
+        self.meta: Dict[str, Any] = schema.get("meta", {})
+        self.schema = [(c["name"], c["type"]) for c in schema["columns"]]
+        self.dictionaries: Dict[str, List[str]] = {
+            c["name"]: c["dictionary"] for c in schema["columns"] if c["type"] == "dictionary"
+        }
+        self._maps: Dict[str, mmap.mmap] = {}
+        self._views: Dict[str, Any] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def _buffer(self, filename: str):
+        """Map a column file into memory."""
+        if filename not in self._maps:
+            with open(os.path.join(self.directory, filename), 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""  # empty files cannot be mapped
+                self._maps[filename] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._maps[filename]
+
+    def column(self, name: str):
+        """Get a column's raw values (floats, day numbers, codes or text offsets) without copying."""
+        view = self._views.get(name)
+        if view is None:
+            column_type = dict(self.schema)[name]
+            buffer = self._buffer(name + FILE_SUFFIX[column_type])
+            if sys.byteorder == "little":
+                view = memoryview(buffer).cast(TYPECODES[column_type])
+            else:
+                view = array(TYPECODES[column_type], bytes(buffer))
+                view.byteswap()
+            self._views[name] = view
+        return view
+
+    def text(self, name: str, row: int) -> str:
+        """Get one value of a string column."""
+        offsets = self.column(name)
+        start = offsets[row - 1] if row else 0
+        return self._buffer(name + ".txt")[start:offsets[row]].decode("utf-8")
+
+    def iter_records(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """Decode rows as dictionaries, all of them or the given row numbers."""
+        decoders = []
+        for name, column_type in self.schema:
+            values = self.column(name)
+            if column_type == "dictionary":
+                decoders.append((name, values, self.dictionaries[name].__getitem__))
+            elif column_type == "date32":
+                decoders.append((name, values, days_to_date))
+            elif column_type == "float64":
+                decoders.append((name, values, None))
+            else:
+                decoders.append((name, None, lambda row, name=name: self.text(name, row)))
+        for row in range(self.rows) if rows is None else rows:
+            record = {}
+            for name, values, decode in decoders:
+                if values is None:
+                    record[name] = decode(row)
+                elif decode is None:
+                    record[name] = values[row]
+                else:
+                    record[name] = decode(values[row])
+            yield record
+
+    def close(self):
+        """Unmap the column files."""
+        for view in self._views.values():
+            if isinstance(view, memoryview):
+                view.release()
+        self._views.clear()
+        for buffer in self._maps.values():
+            buffer.close()
+        self._maps.clear()
@@ -0,0 +1,114 @@
+"""
+Dashboard Module
+
+This module renders every chart in one batch. The analyses share a single
+aggregation pass over the ledger, all charts are drawn in parallel across a
+pool of worker processes, and the results are collected into one HTML or
+multi-page PDF report.
+"""
+import os
+import html
+import base64
+import datetime
+from typing import Dict, List, Optional, Tuple
+from finance_tracker import FinanceTracker, month_bounds
+from financial_analysis import FinancialAnalysis
+from charts import ChartRenderer
+
+Chart = Tuple[str, Dict, str]
+
+
+def months_before(date: datetime.date, months: int) -> datetime.date:
+    """Get the first day of the month ``months`` months before a date's month."""
+    month = date.year * 12 + date.month - 1 - months
+    return datetime.date(month // 12, month % 12 + 1, 1)
+
+
+def dashboard_charts(finance_tracker: FinanceTracker, investment_tracker=None, year: Optional[int] = None,
+                     categories: Optional[List[str]] = None, trend_months: int = 6,
+                     savings_months: int = 12) -> List[Chart]:
+    """Get the (kind, data, file name) of every dashboard chart from one aggregation pass.
+
+    Without ``categories``, a trend chart is drawn for every category with
+    expenses in the trend window.
+    """
+    if year is None:
+        year = datetime.datetime.now().year
+    today = datetime.date.today()
+    analysis = FinancialAnalysis(finance_tracker)
+
+    # One window covering the year and both trend windows
+    start_date = min(datetime.date(year, 1, 1), months_before(today, max(trend_months, savings_months - 1)))
+    end_date = max(datetime.date(year, 12, 31), month_bounds(today.year, today.month)[1])
+    aggregates = finance_tracker.columns().monthly_aggregates(start_date, end_date)
+
+    if categories is None:
+        trend_start = months_before(today, trend_months)
+        categories = sorted({
+            category for (y, m, transaction_type, category) in aggregates.by_category
+            if transaction_type == "expense" and datetime.date(y, m, 1) >= trend_start
+        })
+
+    charts = [analysis.income_vs_expenses_chart(year, aggregates),
+              analysis.savings_rate_chart(savings_months, aggregates)]
+    charts.extend(analysis.category_trend_chart(category, trend_months, aggregates) for category in categories)
+    for chart in (finance_tracker.spending_chart(),
+                  investment_tracker.portfolio_allocation_chart() if investment_tracker else None):
+        if chart is not None:
+            charts.append(chart)
+    return charts
+
+
+def write_html_report(charts: List[Chart], paths: List[str], path: str):
+    """Write a self-contained HTML report embedding the rendered PNGs."""
+    sections = []
+    for (kind, data, filename), image_path in zip(charts, paths):
+        with open(image_path, 'rb') as f:
+            image = base64.b64encode(f.read()).decode("ascii")
+        title = html.escape(data["title"])
+        sections.append(f'<section>\n<h2>{title}</h2>\n'
+                        f'<img src="data:image/png;base64,{image}" alt="{title}">\n</section>')
+
+    generated = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+    with open(path, 'w', encoding="utf-8") as f:
+        f.write("<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n"
+                "<title>Finance Dashboard</title>\n"
+                "<style>body { font-family: sans-serif; margin: 2em; } img { max-width: 100%; }</style>\n"
+                "</head>\n<body>\n"
+                f"<h1>Finance Dashboard</h1>\n<p>Generated {generated}</p>\n")
+        f.write("\n".join(sections))
+        f.write("\n</body>\n</html>\n")
+
+
+def render_dashboard(finance_tracker: FinanceTracker, investment_tracker=None, year: Optional[int] = None,
+                     categories: Optional[List[str]] = None, trend_months: int = 6, savings_months: int = 12,
+                     output_dir: str = ".", report: Optional[str] = "dashboard.html",
+                     workers: Optional[int] = None) -> List[str]:
+    """Render every chart into ``output_dir`` and collect them into a report.
+
+    A ``report`` ending in .pdf is drawn as a multi-page PDF; any other name
+    gets an HTML page. Returns the paths written, the report last.
+    """
+    charts = dashboard_charts(finance_tracker, investment_tracker, year, categories,
+                              trend_months, savings_months)
+    os.makedirs(output_dir, exist_ok=True)
+    if workers is None:
+        workers = min(len(charts), os.cpu_count() or 1)
+    renderer = ChartRenderer(workers=max(workers, 1))
+    try:
+        futures = [renderer.render(kind, data, os.path.join(output_dir, filename))
+                   for kind, data, filename in charts]
+        report_future = None
+        if report and report.lower().endswith(".pdf"):
+            report_future = renderer.render_pdf([(kind, data) for kind, data, _ in charts],
+                                                os.path.join(output_dir, report))
+        paths = [future.result() for future in futures]
+        if report_future is not None:
+            paths.append(report_future.result())
+        elif report:
+            report_path = os.path.join(output_dir, report)
+            write_html_report(charts, paths, report_path)
+            paths.append(report_path)
+    finally:
+        renderer.shutdown()
+    return paths
@@ -0,0 +1,139 @@
+"""
+Exporter Module
+
+This module exports transactions, budgets, goals and investments to CSV, JSON
+Lines or column files. Records are streamed from the trackers one at a time,
+so exporting a large ledger does not load it into memory.
+"""
+import os
+import csv
+import json
+import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from columnfile import (ColumnWriter, TRANSACTION_SCHEMA, BUDGET_SCHEMA, GOAL_SCHEMA,
+                        INVESTMENT_SCHEMA)
+
+EXPORT_FORMATS = ["csv", "jsonl", "columnar"]
+
+DateArg = Union[str, datetime.date, None]
+
+
+def _isoformat(value: DateArg) -> Optional[str]:
+    """Convert a date argument to YYYY-MM-DD."""
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    return value
+
+
+def _in_range(value: Optional[str], start: Optional[str], end: Optional[str]) -> bool:
+    """Check whether a YYYY-MM-DD date lies within an inclusive range."""
+    if start is None and end is None:
+        return True
+    if not value:
+        return False
+    return (start is None or value >= start) and (end is None or value <= end)
+
+
+def iter_transaction_records(finance_tracker, start: DateArg = None, end: DateArg = None,
+                             categories: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Stream transaction records from the ledger, in ledger order."""
+    # A single category is filtered by the store itself, which can use its index
+    category = categories[0] if categories and len(categories) == 1 else None
+    for t in finance_tracker.iter_transactions(start, end, category):
+        if categories and t.category not in categories:
+            continue
+        yield t.to_dict()
+
+
+def _filtered(items: Iterable, date_field: str, start: DateArg, end: DateArg,
+              categories: Optional[List[str]], category_field: Optional[str]) -> Iterator[Dict]:
+    """Stream the records of items within a date range and set of categories."""
+    start, end = _isoformat(start), _isoformat(end)
+    for item in items:
+        record = item.to_dict()
+        if not _in_range(record[date_field], start, end):
+            continue
+        if categories and category_field and record[category_field] not in categories:
+            continue
+        yield record
+
+
+def iter_budget_records(planner, start: DateArg = None, end: DateArg = None,
+                        categories: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Stream budget records, filtered by start date and category."""
+    return _filtered(planner.budgets, "start_date", start, end, categories, "category")
+
+
+def iter_goal_records(goal_tracker, start: DateArg = None, end: DateArg = None,
+                      categories: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Stream goal records, filtered by deadline and category."""
+    return _filtered(goal_tracker.goals, "deadline", start, end, categories, "category")
+
+
+def iter_investment_records(investment_tracker, start: DateArg = None, end: DateArg = None,
+                            categories: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Stream investment records, filtered by purchase date (investments have no category)."""
+    return _filtered(investment_tracker.investments, "purchase_date", start, end, None, None)
+
+
+def export_csv(records: Iterable[Dict], path: str, schema: List[Tuple[str, str]]) -> int:
+    """Write records to a CSV file, returning the number of rows written."""
+    count = 0
+    with open(path, 'w', newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([name for name, _ in schema])
+        for record in records:
+            writer.writerow(["" if record[name] is None else record[name] for name, _ in schema])
+            count += 1
+    return count
+
+
+def export_jsonl(records: Iterable[Dict], path: str, schema: List[Tuple[str, str]]) -> int:
+    """Write records to a JSON Lines file, returning the number of rows written."""
+    count = 0
+    with open(path, 'w', encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def export_columnar(records: Iterable[Dict], path: str, schema: List[Tuple[str, str]]) -> int:
+    """Write records to a column file directory, returning the number of rows written."""
+    with ColumnWriter(path, schema) as writer:
+        return writer.write_all(records)
+
+
+EXPORTERS: Dict[str, Tuple[Callable, str]] = {
+    "csv": (export_csv, ".csv"),
+    "jsonl": (export_jsonl, ".jsonl"),
+    "columnar": (export_columnar, ""),
+}
+
+
+def export_all(directory: str, file_format: str, finance_tracker, planner=None, goal_tracker=None,
+               investment_tracker=None, start: DateArg = None, end: DateArg = None,
+               categories: Optional[List[str]] = None) -> Dict[str, int]:
+    """Export every dataset to a directory, returning the rows written per dataset.
+
+    Dates filter transactions by date, budgets by start date, goals by
+    deadline and investments by purchase date. Categories filter
+    transactions, budgets and goals.
+    """
+    if file_format not in EXPORTERS:
+        raise ValueError(f"Unsupported export format: {file_format!r}")
+    export, suffix = EXPORTERS[file_format]
+    os.makedirs(directory, exist_ok=True)
+
+    datasets = [("transactions", iter_transaction_records, finance_tracker, TRANSACTION_SCHEMA),
+                ("budgets", iter_budget_records, planner, BUDGET_SCHEMA),
+                ("goals", iter_goal_records, goal_tracker, GOAL_SCHEMA),
+                ("investments", iter_investment_records, investment_tracker, INVESTMENT_SCHEMA)]
+    counts = {}
+    for name, records, source, schema in datasets:
+        if source is None:
+            continue
+        path = os.path.join(directory, name + suffix)
+        counts[name] = export(records(source, start, end, categories), path, schema)
+    return counts
@@ -4,129 +4,673 @@ Personal Finance Tracker
 A Python application to help users track their personal finances, analyze spending habits, and plan budgets.
 """
 import os
+import sys
 import json
 import datetime
-from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
-import matplotlib.pyplot as plt
+import shutil
+import calendar
+import itertools
+from collections import deque
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Tuple, Union
+from storage import (Storage, JSONLedgerReader, SnapshotLedgerReader, FsyncPolicy, write_json_array,
+                     atomic_write, append_text, fsync_path, truncate_partial_line)
+from columnfile import ColumnReader, ColumnWriter, TRANSACTION_SCHEMA, iso_date
+from aggregates import MonthlyAggregates
+from persistence import WriteBehind
+from querycache import QueryCache
+
+# Limits of the change log read by changes_since(); older changes make readers start over
+CHANGE_LOG_BATCHES = 1024
+CHANGE_LOG_ROWS = 10000
+
+
+@lru_cache(maxsize=4096)
+def parse_date(value: str) -> datetime.date:
+    """Parse a YYYY-MM-DD string into a date."""
+    return datetime.datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def month_bounds(year: int, month: int) -> Tuple[datetime.date, datetime.date]:
+    """Get the first and last day of a month."""
+    return (datetime.date(year, month, 1),
+            datetime.date(year, month, calendar.monthrange(year, month)[1]))
 
 
 @dataclass
 class Transaction:
     """Represents a financial transaction."""
+    # Slots drop the per-instance __dict__, which dominates memory on large ledgers.
+    # parsed_date and ordinal are derived in __post_init__ so filters never call strptime.
+    __slots__ = ("amount", "category", "description", "date", "transaction_type",
+                 "parsed_date", "ordinal")
+    
     amount: float
     category: str
     description: str
     date: str
     transaction_type: str  # "income" or "expense"
     
+    def __post_init__(self):
+        """Parse the transaction date and intern the strings repeated across rows."""
+        self.category = sys.intern(self.category)
+        self.transaction_type = sys.intern(self.transaction_type)
+        self.parsed_date = parse_date(self.date)
+        if len(self.date) != 10:
+            # strptime accepts 2024-5-1; store it padded so dates compare correctly as strings
+            self.date = self.parsed_date.isoformat()
+        self.date = sys.intern(self.date)
+        self.ordinal = self.parsed_date.toordinal()
+    
     def to_dict(self):
         """Convert transaction to dictionary."""
-        return asdict(self)
+        return {
+            "amount": self.amount,
+            "category": self.category,
+            "description": self.description,
+            "date": self.date,
+            "transaction_type": self.transaction_type
+        }
 
 
-class FinanceTracker:
+class FinanceTracker(WriteBehind):
     """Main class for tracking finances."""
     
-    def __init__(self, data_file="finance_data.json"):
-        """Initialize the finance tracker."""
+    def __init__(self, data_file="finance_data.json", journal=False, compact_threshold=1000,
+                 storage: Optional[Storage] = None, lazy=False,
+                 fsync_policy: Optional[FsyncPolicy] = None, write_behind: bool = False,
+                 binary_snapshot: bool = False):
+        """Initialize the finance tracker.
+        
+        With ``journal=True`` new transactions are appended to a JSON Lines
+        journal next to the data file instead of rewriting the whole file.
+        The journal is compacted into the data file once it holds
+        ``compact_threshold`` entries and at least as many as the data file.
+        
+        When a ``storage`` backend is given it is used instead of the JSON
+        files, and transactions are only read into memory when needed.
+        ``lazy=True`` does the same for the JSON files: until something needs
+        the full list, queries stream over the data file and journal.
+        
+        Files are replaced atomically; ``fsync_policy`` decides how often the
+        writes are synced to disk (every write by default). With
+        ``write_behind=True`` new transactions are kept in memory until
+        ``flush()`` (queries still see them).
+        
+        A data file that cannot be read in full is never overwritten
+        (``load_failed`` is set): rows that could not be read are kept on
+        disk, and new transactions only reach the journal (or stay in
+        memory without one).
+        
+        ``binary_snapshot=True`` keeps a memory-mapped column copy of the
+        data file next to it (``<name>.columns``), rewritten on every save.
+        While it matches the data file the tracker starts from it lazily
+        instead of parsing JSON; the JSON file stays the interchange format,
+        and editing it simply makes the snapshot stale. It is not used with a
+        ``storage`` backend.
+        
+        Reports and analyses are memoized in ``query_cache``, versioned by
+        ``version`` (bumped by every mutation) or, for month ranges, by the
+        months a mutation touched (see ``months_version``).
+        
+        Listeners registered with ``subscribe()`` are told about every batch
+        of new transactions as it is added.
+        """
         self.data_file = data_file
+        self.journal = journal
+        self.journal_file = os.path.splitext(data_file)[0] + ".journal.jsonl"
+        self.compact_threshold = compact_threshold
+        self.storage = storage
+        self.lazy = lazy
+        self.fsync_policy = fsync_policy
+        self._init_write_behind(write_behind)
+        self._unsaved: List[Transaction] = []
+        self.binary_snapshot = binary_snapshot
+        self.binary_snapshot_dir = os.path.splitext(data_file)[0] + ".columns"
+        self._snapshot_reader = None
+        self._mapped_columns = None
+        self.version = 0
+        self._generation = 0
+        self._month_versions: Dict[Tuple[int, int], int] = {}
+        # Recent (version, transactions) batches, for readers that update incrementally
+        self._changes = deque()
+        self._change_rows = 0
+        self._listeners: List[Callable[[List[Transaction]], None]] = []
+        self.query_cache = QueryCache()
         self.transactions = []
+        self._journal_entries = 0
         self.load_data()
+    
+    @property
+    def transactions(self) -> List[Transaction]:
+        """All transactions, read from the storage backend on first access."""
+        if self._transactions is None:
+            self.transactions = list(self._build_transactions(self._source().iter_transactions()))
+        return self._transactions
+    
+    @transactions.setter
+    def transactions(self, value: List[Transaction]):
+        self._transactions = value
+        if value is not None:
+            self._rebuild_indexes()
+    
+    def _source(self) -> Storage:
+        """Get the backend that answers queries while the ledger is not in memory."""
+        # Deferred transactions must reach the backend before it is queried
+        self.flush()
+        if self.storage is not None:
+            return self.storage
+        snapshot = self._open_binary_snapshot()
+        if snapshot is not None:
+            return SnapshotLedgerReader(snapshot, self.journal_file)
+        return JSONLedgerReader(self.data_file, self.journal_file)
+    
+    def _build_transactions(self, records: Iterable[Dict]) -> Iterator[Transaction]:
+        """Create transactions from stored records, skipping the ones that cannot be read.
         
-    def load_data(self):
-        """Load transaction data from file."""
-        if os.path.exists(self.data_file):
+        Skipped rows set ``load_failed``, so saving never drops them.
+        """
+        skipped = 0
+        for r in records:
+            try:
+                yield Transaction(**r)
+            except (KeyError, TypeError, ValueError):
+                skipped += 1
+        if skipped:
+            print(f"Skipped {skipped} unreadable transactions (e.g. dates not in YYYY-MM-DD format).")
+            self.load_failed = True
+    
+    def _data_file_signature(self) -> Optional[List[int]]:
+        """Get the size and modification time of the data file."""
+        if not os.path.exists(self.data_file):
+            return None
+        stat = os.stat(self.data_file)
+        return [stat.st_size, stat.st_mtime_ns]
+    
+    def _open_binary_snapshot(self) -> Optional[ColumnReader]:
+        """Open the binary snapshot if it is enabled and matches the data file."""
+        # The snapshot mirrors the JSON data file, which a storage backend replaces
+        if not self.binary_snapshot or self.storage is not None:
+            return None
+        signature = self._data_file_signature()
+        reader = self._snapshot_reader
+        if reader is None or reader.meta.get("data_file") != signature:
+            self._close_binary_snapshot()
             try:
-                with open(self.data_file, 'r') as f:
-                    data = json.load(f)
-                    self.transactions = [Transaction(**t) for t in data]
-            except (json.JSONDecodeError, KeyError):
-                print("Error loading data file. Starting with empty transactions.")
-                self.transactions = []
+                reader = ColumnReader(self.binary_snapshot_dir)
+            except (OSError, ValueError, KeyError):
+                return None
+            if signature is None or reader.meta.get("data_file") != signature:
+                reader.close()
+                return None
+            self._snapshot_reader = reader
+        return reader
+    
+    def _close_binary_snapshot(self):
+        """Unmap the binary snapshot."""
+        if self._snapshot_reader is not None:
+            self._snapshot_reader.close()
+            self._snapshot_reader = None
+    
+    def write_binary_snapshot(self):
+        """Write the binary snapshot of the data file.
+        
+        The snapshot is only a faster copy of the data file, so a failure is
+        reported and the tracker carries on reading the JSON file.
+        """
+        self._close_binary_snapshot()
+        # Built aside and swapped in, so a crash never leaves a half-written snapshot
+        temp_dir = self.binary_snapshot_dir + ".tmp"
+        try:
+            if os.path.exists(temp_dir):
+                shutil.rmtree(temp_dir)
+            with ColumnWriter(temp_dir, TRANSACTION_SCHEMA) as writer:
+                writer.meta["data_file"] = self._data_file_signature()
+                # The snapshot mirrors the data file; journal entries stay in the journal
+                data_rows = len(self.transactions) - self._journal_entries
+                writer.write_all(t.to_dict() for t in itertools.islice(self.transactions, data_rows))
+            if os.path.exists(self.binary_snapshot_dir):
+                shutil.rmtree(self.binary_snapshot_dir)
+            os.replace(temp_dir, self.binary_snapshot_dir)
+        except (OSError, ValueError) as e:
+            # A stale snapshot no longer matches the data file, so it is ignored
+            print(f"Could not write the binary snapshot: {e}")
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def iter_transactions(self, start: Union[str, datetime.date, None] = None,
+                          end: Union[str, datetime.date, None] = None,
+                          category: Optional[str] = None) -> Iterator[Transaction]:
+        """Iterate over transactions without loading the ledger into memory.
+        
+        Transactions come in insertion order, optionally limited to a date
+        range (inclusive) and a category.
+        """
+        if start is not None:
+            start = start.isoformat() if isinstance(start, datetime.date) else iso_date(start)
+        if end is not None:
+            end = end.isoformat() if isinstance(end, datetime.date) else iso_date(end)
+        
+        if self._transactions is None:
+            yield from self._build_transactions(
+                self._source().iter_transactions(category=category, start_date=start, end_date=end))
+            return
+        
+        for t in self._transactions:
+            if category is not None and t.category != category:
+                continue
+            if (start is not None and t.date < start) or (end is not None and t.date > end):
+                continue
+            yield t
+    
+    def _rebuild_indexes(self):
+        """Rebuild the in-memory indexes from the transactions list."""
+        # Date index: transactions sorted by date (stable, so same-day
+        # transactions keep insertion order) with a parallel list of ordinals
+        self._by_date = sorted(self._transactions, key=lambda t: t.ordinal)
+        self._date_ordinals = [t.ordinal for t in self._by_date]
+        self._date_index_sorted = True
+        # Columnar copy for vectorized analytics, built on first use
+        self._columns = None
+        # Running totals, updated in O(1) by every append
+        self._type_totals = {}
+        self._spending_by_category = {}
+        self.monthly_totals = MonthlyAggregates()
+        for t in self._transactions:
+            self._add_to_totals(t)
+    
+    def _add_to_totals(self, transaction: Transaction):
+        """Add a transaction to the running totals."""
+        transaction_type = transaction.transaction_type
+        self._type_totals[transaction_type] = self._type_totals.get(transaction_type, 0) + transaction.amount
+        if transaction_type == "expense":
+            category = transaction.category
+            self._spending_by_category[category] = self._spending_by_category.get(category, 0) + transaction.amount
+        self.monthly_totals.add(transaction)
+    
+    def _index_transactions(self, transactions: List[Transaction]):
+        """Add newly appended transactions to the in-memory indexes."""
+        if not self._date_index_sorted:
+            self._by_date.extend(transactions)
+        elif len(transactions) == 1:
+            transaction = transactions[0]
+            position = bisect_right(self._date_ordinals, transaction.ordinal)
+            self._date_ordinals.insert(position, transaction.ordinal)
+            self._by_date.insert(position, transaction)
         else:
+            batch = sorted(transactions, key=lambda t: t.ordinal)
+            self._by_date.extend(batch)
+            if self._date_ordinals and batch[0].ordinal < self._date_ordinals[-1]:
+                # Back-dated batch: re-sort on the next range query, so a run of
+                # imports costs one sort instead of one merge per batch
+                self._date_index_sorted = False
+            else:
+                self._date_ordinals.extend(t.ordinal for t in batch)
+        
+        if self._columns is not None:
+            self._columns.extend(transactions)
+        for transaction in transactions:
+            self._add_to_totals(transaction)
+    
+    def columns(self):
+        """Get a NumPy columnar view of the ledger, kept in sync on append.
+        
+        While the ledger is not in memory and the binary snapshot is current,
+        the columns are memory-mapped from the snapshot (with the journal
+        entries appended) and no Transaction objects are created.
+        """
+        from columnar import ColumnarLedger, MappedColumnarLedger
+        
+        if self._transactions is None:
+            self.flush()
+            snapshot = self._open_binary_snapshot()
+            if snapshot is not None:
+                journal = None
+                if os.path.exists(self.journal_file):
+                    stat = os.stat(self.journal_file)
+                    journal = (stat.st_size, stat.st_mtime_ns)
+                key = (snapshot.meta["data_file"], journal)
+                if self._mapped_columns is None or self._mapped_columns[0] != key:
+                    columns = MappedColumnarLedger(self.binary_snapshot_dir)
+                    reader = SnapshotLedgerReader(snapshot, self.journal_file)
+                    columns.extend(self._build_transactions(reader.iter_journal()))
+                    self._mapped_columns = (key, columns)
+                return self._mapped_columns[1]
+        
+        transactions = self.transactions
+        if self._columns is None:
+            self._columns = ColumnarLedger.from_transactions(transactions)
+        return self._columns
+    
+    def months_version(self, start_date: datetime.date, end_date: datetime.date) -> Tuple:
+        """Get a version of the months from start_date to end_date that changes whenever they do.
+        
+        Closed months keep their version until a back-dated transaction lands in them.
+        """
+        month = start_date.year * 12 + start_date.month - 1
+        last = end_date.year * 12 + end_date.month - 1
+        versions = self._month_versions
+        return (self._generation,
+                tuple(versions.get(divmod(m, 12), 0) for m in range(month, last + 1)))
+    
+    def _record_change(self, transactions: List[Transaction]):
+        """Bump the ledger version and the versions of the months the transactions fall in."""
+        self.version += 1
+        for t in transactions:
+            key = (t.parsed_date.year, t.parsed_date.month - 1)
+            self._month_versions[key] = self._month_versions.get(key, 0) + 1
+        self._changes.append((self.version, transactions))
+        self._change_rows += len(transactions)
+        # Bounded by rows, not batches, so a large import is not kept alive by the log
+        while self._changes and (self._change_rows > CHANGE_LOG_ROWS or len(self._changes) > CHANGE_LOG_BATCHES):
+            self._change_rows -= len(self._changes.popleft()[1])
+    
+    def changes_since(self, version: int) -> Tuple[int, Optional[List[Transaction]]]:
+        """Get the current version and the transactions added after ``version``.
+        
+        The transactions are None when they are no longer known (after a
+        reload, or when too many have been added since), in which
+        case the reader has to start over.
+        """
+        with self._lock:
+            if version == self.version:
+                return self.version, []
+            if version > self.version or not self._changes or self._changes[0][0] > version + 1:
+                return self.version, None
+            return self.version, [t for batch_version, batch in self._changes
+                                  if batch_version > version for t in batch]
+    
+    def subscribe(self, listener: Callable[[List[Transaction]], None]):
+        """Call ``listener`` with every batch of new transactions, right after it is added.
+        
+        Listeners run synchronously while the ledger is locked, so they must be quick.
+        """
+        self._listeners.append(listener)
+    
+    def unsubscribe(self, listener: Callable[[List[Transaction]], None]):
+        """Stop calling a listener."""
+        self._listeners.remove(listener)
+    
+    def _append(self, transactions: List[Transaction]):
+        """Append transactions to the in-memory ledger."""
+        self._transactions.extend(transactions)
+        self._index_transactions(transactions)
+        
+    def load_data(self):
+        """Load transaction data from file, replaying any journal entries."""
+        # Every cached result predates the reload
+        self._generation += 1
+        self.version += 1
+        self._month_versions.clear()
+        self._changes.clear()
+        self._change_rows = 0
+        self.load_failed = False
+        # A crash can leave a torn last line; drop it so the next append starts on a new line
+        truncate_partial_line(self.journal_file)
+        
+        if self.storage is not None:
+            # Rows stay in the database until something needs them in memory
+            self.transactions = None
+            return
+        
+        if self.lazy or self._open_binary_snapshot() is not None:
+            self.transactions = None
+            self._journal_entries = 0
+            if os.path.exists(self.journal_file):
+                with open(self.journal_file, 'r') as f:
+                    self._journal_entries = sum(1 for _ in f)
+            return
+        
+        reader = JSONLedgerReader(self.data_file, self.journal_file)
+        transactions = []
+        skipped = 0
+        try:
+            # Records are decoded one at a time, so the raw JSON never sits in memory whole
+            for r in reader.iter_transactions():
+                try:
+                    transactions.append(Transaction(**r))
+                except (KeyError, TypeError, ValueError):
+                    skipped += 1
+        except json.JSONDecodeError:
+            print("Error loading data file. Starting with empty transactions; "
+                  "the file will not be overwritten until it is fixed.")
+            self.load_failed = True
+            self._journal_entries = 0
             self.transactions = []
+            return
+        self._journal_entries = reader.journal_entries
+        self.transactions = transactions
+        if skipped:
+            print(f"Skipped {skipped} unreadable transactions (e.g. dates not in YYYY-MM-DD format); "
+                  "the data file will not be overwritten until they are fixed.")
+            self.load_failed = True
+        elif self.binary_snapshot and os.path.exists(self.data_file):
+            # The snapshot is missing or stale; write it so the next start can skip the JSON
+            self.write_binary_snapshot()
     
     def save_data(self):
-        """Save transaction data to file."""
-        with open(self.data_file, 'w') as f:
-            json.dump([t.to_dict() for t in self.transactions], f, indent=2)
+        """Save transaction data to file and clear the journal."""
+        transactions = self.transactions
+        if self.load_failed:
+            # Rewriting the file would drop the rows that could not be read; the journal keeps new ones
+            target = self.data_file if self.storage is None else "the database"
+            print(f"Not saving {target}: it has rows that could not be read. Fix them and restart.")
+            return
+        if self.storage is not None:
+            self.storage.replace_transactions(t.to_dict() for t in transactions)
+            return
+        
+        # The journal is removed afterwards, so the new snapshot must reach the disk first
+        has_journal = os.path.exists(self.journal_file)
+        with atomic_write(self.data_file, self.fsync_policy, sync=has_journal) as f:
+            write_json_array(f, (t.to_dict() for t in self.transactions))
+        if has_journal:
+            os.remove(self.journal_file)
+            fsync_path(os.path.dirname(os.path.abspath(self.journal_file)))
+        self._journal_entries = 0
+        if self.binary_snapshot:
+            self.write_binary_snapshot()
+    
+    def append_to_journal(self, transactions: List[Transaction]):
+        """Append transactions to the journal, compacting when it grows too large."""
+        append_text(self.journal_file, "".join(json.dumps(t.to_dict()) + "\n" for t in transactions),
+                    self.fsync_policy)
+        self._journal_entries += len(transactions)
+        # Wait until the journal is as large as the snapshot, so that the cost
+        # of rewriting the snapshot stays amortized O(1) per transaction
+        snapshot_size = 0
+        if self._transactions is not None:
+            snapshot_size = len(self._transactions) - self._journal_entries
+        if self._journal_entries >= max(self.compact_threshold, snapshot_size):
+            self.compact()
+    
+    def compact(self):
+        """Fold the journal into the data file snapshot."""
+        self.flush()
+        if self.storage is None and os.path.exists(self.journal_file):
+            self.save_data()
     
     def add_transaction(self, amount: float, category: str, description: str, 
                         date: Optional[str] = None, transaction_type: str = "expense"):
         """Add a new transaction."""
-        if date is None:
-            date = datetime.datetime.now().strftime("%Y-%m-%d")
+        return self.add_transactions([{
+            "amount": amount,
+            "category": category,
+            "description": description,
+            "date": date,
+            "transaction_type": transaction_type
+        }])[0]
+    
+    def add_transactions(self, rows: Iterable[Dict]) -> List[Transaction]:
+        """Add many transactions and persist them once.
         
-        transaction = Transaction(
-            amount=float(amount),
-            category=category,
-            description=description,
-            date=date,
-            transaction_type=transaction_type
-        )
+        Each row is a dictionary with the arguments of ``add_transaction``.
+        All rows are validated before anything is stored, so a bad row leaves
+        the ledger unchanged.
+        """
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        transactions = [
+            Transaction(
+                amount=float(row["amount"]),
+                category=row["category"],
+                description=row["description"],
+                date=row.get("date") or today,
+                transaction_type=row.get("transaction_type", "expense")
+            )
+            for row in rows
+        ]
+        if not transactions:
+            return transactions
         
-        self.transactions.append(transaction)
-        self.save_data()
-        return transaction
+        if self.storage is None and self._transactions is None and not self.journal:
+            # Rewriting the data file needs the whole ledger
+            self.transactions
+        with self._lock:
+            if self._transactions is not None:
+                self._append(transactions)
+            self._record_change(transactions)
+            if self.deferring:
+                self._unsaved.extend(transactions)
+                self.dirty = True
+            else:
+                self._persist(transactions)
+            for listener in self._listeners:
+                listener(transactions)
+        return transactions
+    
+    def _persist(self, transactions: List[Transaction]):
+        """Write new transactions to the storage backend, the journal or the data file."""
+        if self.storage is not None:
+            self.storage.insert_transactions([t.to_dict() for t in transactions])
+        elif self.journal:
+            self.append_to_journal(transactions)
+        else:
+            self.save_data()
+    
+    def _save(self):
+        """Persist the transactions added since the last flush (see WriteBehind)."""
+        transactions, self._unsaved = self._unsaved, []
+        try:
+            self._persist(transactions)
+        except BaseException:
+            self._unsaved = transactions + self._unsaved
+            raise
     
     def get_balance(self):
         """Calculate current balance."""
-        income = sum(t.amount for t in self.transactions if t.transaction_type == "income")
-        expenses = sum(t.amount for t in self.transactions if t.transaction_type == "expense")
-        return income - expenses
+        if self._transactions is None:
+            totals = self._source().totals_by_type()
+            return totals.get("income", 0) - totals.get("expense", 0)
+        
+        return self._type_totals.get("income", 0) - self._type_totals.get("expense", 0)
     
     def get_transactions_by_category(self, category=None):
         """Get transactions filtered by category."""
+        if self._transactions is None and category:
+            return list(self._build_transactions(self._source().iter_transactions(category=category)))
         if category:
             return [t for t in self.transactions if t.category == category]
         return self.transactions
     
+    def get_transactions_between(self, start: Union[str, datetime.date],
+                                 end: Union[str, datetime.date]) -> List[Transaction]:
+        """Get transactions dated from start to end (inclusive), ordered by date."""
+        if isinstance(start, str):
+            start = parse_date(start)
+        if isinstance(end, str):
+            end = parse_date(end)
+        
+        if self._transactions is None:
+            transactions = list(self._build_transactions(self._source().iter_transactions(
+                start_date=start.isoformat(), end_date=end.isoformat())))
+            transactions.sort(key=lambda t: t.ordinal)
+            return transactions
+        
+        if not self._date_index_sorted:
+            # Stable sort; Timsort merges the already sorted prefix with the new tail
+            self._by_date.sort(key=lambda t: t.ordinal)
+            self._date_ordinals = [t.ordinal for t in self._by_date]
+            self._date_index_sorted = True
+        
+        low = bisect_left(self._date_ordinals, start.toordinal())
+        high = bisect_right(self._date_ordinals, end.toordinal())
+        return self._by_date[low:high]
+    
     def get_spending_by_category(self):
         """Get total spending grouped by category."""
-        categories = {}
-        for t in self.transactions:
+        if self._transactions is None:
+            return self._source().totals_by_category("expense")
+        
+        return dict(self._spending_by_category)
+    
+    def get_spending_between(self, start: Union[str, datetime.date],
+                             end: Union[str, datetime.date]) -> Dict[str, float]:
+        """Get total spending by category from start to end (inclusive), using the date index."""
+        if isinstance(start, str):
+            start = parse_date(start)
+        if isinstance(end, str):
+            end = parse_date(end)
+        
+        if self._transactions is None:
+            return self._source().totals_by_category("expense", start.isoformat(), end.isoformat())
+        
+        spending = {}
+        for t in self.get_transactions_between(start, end):
             if t.transaction_type == "expense":
-                if t.category not in categories:
-                    categories[t.category] = 0
-                categories[t.category] += t.amount
-        return categories
+                spending[t.category] = spending.get(t.category, 0) + t.amount
+        return spending
     
-    def visualize_spending(self):
-        """Create a pie chart of spending by category."""
+    def spending_chart(self):
+        """Get the (kind, data, file name) of the spending pie chart, or None without expenses."""
         spending = self.get_spending_by_category()
         if not spending:
-            print("No expense data to visualize.")
-            return
+            return None
+        return "pie", {
+            "title": "Spending by Category",
+            "labels": list(spending.keys()),
+            "values": list(spending.values())
+        }, 'spending_chart.png'
+    
+    def visualize_spending(self):
+        """Create a pie chart of spending by category.
         
-        labels = list(spending.keys())
-        values = list(spending.values())
+        The chart is rendered in the background (see charts); the returned
+        future resolves once 'spending_chart.png' is written.
+        """
+        from charts import default_renderer, report_chart
         
-        plt.figure(figsize=(10, 7))
-        plt.pie(values, labels=labels, autopct='%1.1f%%')
-        plt.title('Spending by Category')
-        plt.axis('equal')
-        plt.savefig('spending_chart.png')
-        plt.close()
-        print("Chart saved as 'spending_chart.png'")
+        chart = self.spending_chart()
+        if chart is None:
+            print("No expense data to visualize.")
+            return None
+        kind, data, filename = chart
+        future = default_renderer().render(kind, data, filename)
+        report_chart(future, filename)
+        return future
     
     def generate_monthly_report(self, year=None, month=None):
-        """Generate a monthly financial report."""
+        """Generate a monthly financial report (cached until the month changes)."""
         if year is None or month is None:
             now = datetime.datetime.now()
             year = now.year
             month = now.month
         
+        return self.query_cache.get(("monthly_report", year, month),
+                                    self.months_version(*month_bounds(year, month)),
+                                    lambda: self._generate_monthly_report(year, month))
+    
+    def _generate_monthly_report(self, year, month):
+        """Compute a monthly report."""
+        if self._transactions is None:
+            return self._generate_monthly_report_from_storage(year, month)
+        
         # Filter transactions for the specified month
-        monthly_transactions = [
-            t for t in self.transactions 
-            if datetime.datetime.strptime(t.date, "%Y-%m-%d").year == year
-            and datetime.datetime.strptime(t.date, "%Y-%m-%d").month == month
-        ]
+        monthly_transactions = self.get_transactions_between(*month_bounds(year, month))
         
         # Calculate totals
-        income = sum(t.amount for t in monthly_transactions if t.transaction_type == "income")
-        expenses = sum(t.amount for t in monthly_transactions if t.transaction_type == "expense")
+        income = self.monthly_totals.total(year, month, "income")
+        expenses = self.monthly_totals.total(year, month, "expense")
         net = income - expenses
         
         # Group expenses by category
@@ -149,6 +693,22 @@ class FinanceTracker:
         
         return report
     
+    def _generate_monthly_report_from_storage(self, year, month):
+        """Generate a monthly report from the backend without loading the ledger."""
+        start_date, end_date = (d.isoformat() for d in month_bounds(year, month))
+        totals = self._source().totals_by_type(start_date, end_date)
+        income = totals.get("income", 0)
+        expenses = totals.get("expense", 0)
+        categories = self._source().totals_by_category("expense", start_date, end_date)
+        return {
+            "year": year,
+            "month": month,
+            "income": income,
+            "expenses": expenses,
+            "net": income - expenses,
+            "categories": categories
+        }
+    
     # TEMP: Clear saved data (run this once)
 
 
@@ -5,10 +5,9 @@ This module provides advanced financial analysis capabilities for the finance tr
 """
 import datetime
 import calendar
-import matplotlib.pyplot as plt
-import numpy as np
 from typing import List, Dict, Optional
-from finance_tracker import FinanceTracker, Transaction
+from finance_tracker import FinanceTracker, Transaction, month_bounds
+from aggregates import MonthlyAggregates
 
 
 class FinancialAnalysis:
@@ -18,8 +17,22 @@ class FinancialAnalysis:
         """Initialize the financial analysis."""
         self.finance_tracker = finance_tracker
     
-    def monthly_income_vs_expenses(self, year=None):
-        """Analyze monthly income vs expenses for a given year."""
+    def _aggregate(self, start_date: datetime.date, end_date: datetime.date) -> MonthlyAggregates:
+        """Bucket all transactions between two dates with grouped NumPy reductions."""
+        return self.finance_tracker.columns().monthly_aggregates(start_date, end_date)
+    
+    def _cached(self, key, start_date: datetime.date, end_date: datetime.date, compute):
+        """Serve a query over a window of months from the tracker's query cache."""
+        tracker = self.finance_tracker
+        return tracker.query_cache.get(key, tracker.months_version(start_date, end_date), compute)
+    
+    def monthly_income_vs_expenses(self, year=None, aggregates: Optional[MonthlyAggregates] = None):
+        """Analyze monthly income vs expenses for a given year.
+        
+        Like the other analyses, it can reuse ``aggregates`` that already
+        cover its window instead of aggregating the ledger again; without
+        them the result is cached until a month in the window changes.
+        """
         if year is None:
             year = datetime.datetime.now().year
         
@@ -29,13 +42,16 @@ class FinancialAnalysis:
         expenses_by_month = {m: 0 for m in months}
         
         # Categorize transactions by month
-        for transaction in self.finance_tracker.transactions:
-            date = datetime.datetime.strptime(transaction.date, "%Y-%m-%d")
-            if date.year == year and date.month in months:
-                if transaction.transaction_type == "income":
-                    income_by_month[date.month] += transaction.amount
+        if aggregates is None:
+            window = (datetime.date(year, 1, 1), datetime.date(year, 12, 31))
+            return self._cached(("income_vs_expenses", year), *window,
+                                lambda: self.monthly_income_vs_expenses(year, self._aggregate(*window)))
+        for month in months:
+            for transaction_type, total in aggregates.totals_by_type(year, month).items():
+                if transaction_type == "income":
+                    income_by_month[month] += total
                 else:  # expense
-                    expenses_by_month[date.month] += transaction.amount
+                    expenses_by_month[month] += total
         
         return {
             "months": list(calendar.month_abbr)[1:],
@@ -43,7 +59,8 @@ class FinancialAnalysis:
             "expenses": [expenses_by_month[m] for m in months]
         }
     
-    def category_trend_analysis(self, category: str, months: int = 6):
+    def category_trend_analysis(self, category: str, months: int = 6,
+                                aggregates: Optional[MonthlyAggregates] = None):
         """Analyze spending trend for a specific category over recent months."""
         today = datetime.datetime.now()
         
@@ -57,6 +74,12 @@ class FinancialAnalysis:
             else:
                 start_date = datetime.datetime(start_date.year, start_date.month - 1, 1)
         
+        # Aggregate the whole window once
+        if aggregates is None:
+            window = (start_date.date(), month_bounds(end_date.year, end_date.month)[1])
+            return self._cached(("category_trend", category) + window, *window,
+                                lambda: self.category_trend_analysis(category, months, self._aggregate(*window)))
+        
         # Initialize data structures
         month_labels = []
         spending = []
@@ -72,13 +95,7 @@ class FinancialAnalysis:
             month_labels.append(month_label)
             
             # Calculate spending for this category in this month
-            monthly_spending = sum(
-                t.amount for t in self.finance_tracker.transactions
-                if t.transaction_type == "expense"
-                and t.category == category
-                and datetime.datetime.strptime(t.date, "%Y-%m-%d").year == year
-                and datetime.datetime.strptime(t.date, "%Y-%m-%d").month == month
-            )
+            monthly_spending = aggregates.category_total(year, month, "expense", category)
             
             spending.append(monthly_spending)
             
@@ -94,7 +111,7 @@ class FinancialAnalysis:
             "spending": spending
         }
     
-    def savings_rate_analysis(self, months: int = 12):
+    def savings_rate_analysis(self, months: int = 12, aggregates: Optional[MonthlyAggregates] = None):
         """Calculate savings rate over time."""
         today = datetime.datetime.now()
         
@@ -108,6 +125,12 @@ class FinancialAnalysis:
             else:
                 start_date = datetime.datetime(start_date.year, start_date.month - 1, 1)
         
+        # Aggregate the whole window once
+        if aggregates is None:
+            window = (start_date.date(), month_bounds(end_date.year, end_date.month)[1])
+            return self._cached(("savings_rate",) + window, *window,
+                                lambda: self.savings_rate_analysis(months, self._aggregate(*window)))
+        
         # Initialize data structures
         month_labels = []
         savings_rates = []
@@ -123,19 +146,8 @@ class FinancialAnalysis:
             month_labels.append(month_label)
             
             # Calculate income and expenses for this month
-            monthly_income = sum(
-                t.amount for t in self.finance_tracker.transactions
-                if t.transaction_type == "income"
-                and datetime.datetime.strptime(t.date, "%Y-%m-%d").year == year
-                and datetime.datetime.strptime(t.date, "%Y-%m-%d").month == month
-            )
-            
-            monthly_expenses = sum(
-                t.amount for t in self.finance_tracker.transactions
-                if t.transaction_type == "expense"
-                and datetime.datetime.strptime(t.date, "%Y-%m-%d").year == year
-                and datetime.datetime.strptime(t.date, "%Y-%m-%d").month == month
-            )
+            monthly_income = aggregates.total(year, month, "income")
+            monthly_expenses = aggregates.total(year, month, "expense")
             
             # Calculate savings rate
             if monthly_income > 0:
@@ -156,78 +168,70 @@ class FinancialAnalysis:
             "savings_rates": savings_rates
         }
     
+    def income_vs_expenses_chart(self, year=None, aggregates: Optional[MonthlyAggregates] = None):
+        """Get the (kind, data, file name) of the income vs expenses chart (see charts)."""
+        data = self.monthly_income_vs_expenses(year, aggregates)
+        return "income_vs_expenses", {
+            "title": f"Monthly Income vs Expenses ({year})",
+            "months": data["months"],
+            "income": data["income"],
+            "expenses": data["expenses"]
+        }, 'income_vs_expenses.png'
+    
+    def category_trend_chart(self, category: str, months: int = 6,
+                             aggregates: Optional[MonthlyAggregates] = None):
+        """Get the (kind, data, file name) of a category trend chart."""
+        data = self.category_trend_analysis(category, months, aggregates)
+        return "line", {
+            "title": f"Spending Trend: {category}",
+            "ylabel": "Amount (Rs)",
+            "months": data["months"],
+            "values": data["spending"]
+        }, f'trend_{category.lower().replace(" ", "_")}.png'
+    
+    def savings_rate_chart(self, months: int = 12, aggregates: Optional[MonthlyAggregates] = None):
+        """Get the (kind, data, file name) of the savings rate chart."""
+        data = self.savings_rate_analysis(months, aggregates)
+        return "line", {
+            "title": "Monthly Savings Rate",
+            "ylabel": "Savings Rate (%)",
+            "months": data["months"],
+            "values": data["savings_rates"],
+            "target": 20,
+            "target_label": "Target (20%)"
+        }, 'savings_rate.png'
+    
     def visualize_income_vs_expenses(self, year=None):
-        """Visualize monthly income vs expenses."""
-        data = self.monthly_income_vs_expenses(year)
-        
-        months = data["months"]
-        income = data["income"]
-        expenses = data["expenses"]
-        
-        x = np.arange(len(months))
-        width = 0.35
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        rects1 = ax.bar(x - width/2, income, width, label='Income')
-        rects2 = ax.bar(x + width/2, expenses, width, label='Expenses')
+        """Visualize monthly income vs expenses.
         
-        ax.set_title(f'Monthly Income vs Expenses ({year})')
-        ax.set_xlabel('Month')
-        ax.set_ylabel('Amount (Rs)')
-        ax.set_xticks(x)
-        ax.set_xticklabels(months)
-        ax.legend()
+        Like the other visualize_* methods, the chart is rendered in the
+        background (see charts) and a future resolving to the file name is
+        returned.
+        """
+        from charts import default_renderer, report_chart
         
-        # Add net savings/deficit
-        for i in range(len(months)):
-            net = income[i] - expenses[i]
-            color = 'green' if net >= 0 else 'red'
-            ax.annotate(f'Rs{net:.0f}', 
-                        xy=(i, max(income[i], expenses[i]) + 50),
-                        ha='center', va='bottom',
-                        color=color)
-        
-        plt.tight_layout()
-        plt.savefig('income_vs_expenses.png')
-        plt.close()
-        print("Chart saved as 'income_vs_expenses.png'")
+        kind, data, filename = self.income_vs_expenses_chart(year)
+        future = default_renderer().render(kind, data, filename)
+        report_chart(future, filename)
+        return future
     
     def visualize_category_trend(self, category: str, months: int = 6):
         """Visualize spending trend for a specific category."""
-        data = self.category_trend_analysis(category, months)
-        
-        plt.figure(figsize=(10, 6))
-        plt.plot(data["months"], data["spending"], marker='o', linestyle='-')
-        plt.title(f'Spending Trend: {category}')
-        plt.xlabel('Month')
-        plt.ylabel('Amount (Rs)')
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
+        from charts import default_renderer, report_chart
         
-        filename = f'trend_{category.lower().replace(" ", "_")}.png'
-        plt.savefig(filename)
-        plt.close()
-        print(f"Chart saved as '{filename}'")
+        kind, data, filename = self.category_trend_chart(category, months)
+        future = default_renderer().render(kind, data, filename)
+        report_chart(future, filename)
+        return future
     
     def visualize_savings_rate(self, months: int = 12):
         """Visualize savings rate over time."""
-        data = self.savings_rate_analysis(months)
-        
-        plt.figure(figsize=(10, 6))
-        plt.plot(data["months"], data["savings_rates"], marker='o', linestyle='-')
-        plt.title('Monthly Savings Rate')
-        plt.xlabel('Month')
-        plt.ylabel('Savings Rate (%)')
-        plt.grid(True, linestyle='--', alpha=0.7)
-        plt.xticks(rotation=45)
-        plt.axhline(y=20, color='r', linestyle='--', alpha=0.7, label='Target (20%)')
-        plt.legend()
-        plt.tight_layout()
+        from charts import default_renderer, report_chart
         
-        plt.savefig('savings_rate.png')
-        plt.close()
-        print("Chart saved as 'savings_rate.png'")
+        kind, data, filename = self.savings_rate_chart(months)
+        future = default_renderer().render(kind, data, filename)
+        report_chart(future, filename)
+        return future
 
 
 def main():
@@ -7,8 +7,10 @@ import json
 import os
 import datetime
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
+from typing import Iterable, List, Dict, Optional
 from finance_tracker import FinanceTracker
+from storage import Storage, FsyncPolicy, atomic_write
+from persistence import WriteBehind, ReadOnlyView
 
 
 @dataclass
@@ -38,18 +40,53 @@ class Goal:
         return (deadline - today).days
 
 
-class GoalTracker:
+class GoalTracker(WriteBehind):
     """Class for tracking financial goals."""
     
-    def __init__(self, finance_tracker: FinanceTracker, goals_file="goals.json"):
-        """Initialize the goal tracker."""
+    def __init__(self, finance_tracker: FinanceTracker, goals_file="goals.json",
+                 storage: Optional[Storage] = None,
+                 fsync_policy: Optional[FsyncPolicy] = None, write_behind: bool = False):
+        """Initialize the goal tracker.
+        
+        With ``write_behind=True`` changes are only saved by ``flush()``.
+        """
         self.finance_tracker = finance_tracker
         self.goals_file = goals_file
         self.goals = []
+        self.storage = storage
+        self.fsync_policy = fsync_policy
+        self._init_write_behind(write_behind)
         self.load_goals()
     
+    @property
+    def goals(self) -> ReadOnlyView:
+        """All goals, in creation order (a read-only view; see create_goal)."""
+        return ReadOnlyView(self._goals)
+    
+    @goals.setter
+    def goals(self, value: Iterable[Goal]):
+        self._goals = list(value)
+        self._rebuild_indexes()
+    
+    def _rebuild_indexes(self):
+        """Rebuild the name and category indexes from the goals list."""
+        self._by_name: Dict[str, Goal] = {}
+        self._by_category: Dict[str, List[Goal]] = {}
+        for goal in self._goals:
+            self._index(goal)
+    
+    def _index(self, goal: Goal):
+        """Add a goal to the indexes."""
+        # Lookups by name find the first goal with that name
+        self._by_name.setdefault(goal.name, goal)
+        self._by_category.setdefault(goal.category, []).append(goal)
+    
     def load_goals(self):
         """Load goals from file."""
+        if self.storage is not None:
+            self.goals = [Goal(**g) for g in self.storage.load_records("goals")]
+            return
+        
         if os.path.exists(self.goals_file):
             try:
                 with open(self.goals_file, 'r') as f:
@@ -63,9 +100,17 @@ class GoalTracker:
     
     def save_goals(self):
         """Save goals to file."""
-        with open(self.goals_file, 'w') as f:
+        if self.storage is not None:
+            self.storage.replace_records("goals", [g.to_dict() for g in self.goals])
+            return
+        
+        with atomic_write(self.goals_file, self.fsync_policy) as f:
             json.dump([g.to_dict() for g in self.goals], f, indent=2)
     
+    def _save(self):
+        """Save goals (see WriteBehind)."""
+        self.save_goals()
+    
     def create_goal(self, name: str, target_amount: float, deadline: str, 
                    category: str, description: str, current_amount: float = 0.0):
         """Create a new financial goal."""
@@ -78,33 +123,31 @@ class GoalTracker:
             description=description
         )
         
-        self.goals.append(goal)
-        self.save_goals()
+        self._goals.append(goal)
+        self._index(goal)
+        self._changed()
         return goal
     
     def update_goal_progress(self, goal_name: str, amount: float):
         """Update progress towards a goal."""
-        for goal in self.goals:
-            if goal.name == goal_name:
-                goal.current_amount += amount
-                self.save_goals()
-                return True
-        return False
+        goal = self._by_name.get(goal_name)
+        if goal is None:
+            return False
+        goal.current_amount += amount
+        self._changed()
+        return True
     
     def get_all_goals(self):
-        """Get all goals."""
+        """Get all goals (a read-only view)."""
         return self.goals
     
     def get_goal_by_name(self, name: str):
         """Get a goal by name."""
-        for goal in self.goals:
-            if goal.name == name:
-                return goal
-        return None
+        return self._by_name.get(name)
     
     def get_goals_by_category(self, category: str):
         """Get goals by category."""
-        return [g for g in self.goals if g.category == category]
+        return list(self._by_category.get(category, ()))
     
     def get_goals_summary(self):
         """Get summary of all goals."""
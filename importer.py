@@ -0,0 +1,277 @@
+"""
+Importer Module
+
+This module imports bank statements (CSV and OFX) into the finance tracker.
+Statements are read as a stream and committed in batches, so memory use does
+not grow with the size of the statement.
+"""
+import os
+import re
+import csv
+import time
+import hashlib
+import datetime
+from collections import Counter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+from finance_tracker import FinanceTracker
+
+# Header names recognised for each field, compared case-insensitively
+COLUMN_ALIASES = {
+    "date": ["date", "transaction date", "txn date", "posting date", "posted", "value date"],
+    "amount": ["amount", "amt", "transaction amount", "value"],
+    "debit": ["debit", "withdrawal", "withdrawal amt.", "withdrawal amount", "dr"],
+    "credit": ["credit", "deposit", "deposit amt.", "deposit amount", "cr"],
+    "description": ["description", "narration", "details", "memo", "name", "particulars", "remarks"],
+    "category": ["category"],
+    "transaction_type": ["transaction_type", "type", "dr/cr", "cr/dr"],
+}
+
+DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%d-%b-%Y", "%d %b %Y", "%m/%d/%Y"]
+
+INCOME_TYPES = {"income", "credit", "cr", "deposit", "dep"}
+
+DEFAULT_CATEGORY = "Uncategorized"
+
+
+def transaction_key(record: Dict) -> bytes:
+    """Get a compact hash identifying a transaction for duplicate detection."""
+    text = "\x1f".join([
+        record["date"],
+        f"{float(record['amount']):.2f}",
+        record["description"].strip().lower(),
+        record["transaction_type"],
+    ])
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def parse_amount(value: str) -> float:
+    """Parse an amount such as 'Rs 1,234.50', '(12.00)' or '-12'."""
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    value = value.strip()
+    negative = value.startswith("(") and value.endswith(")")
+    value = re.sub(r"[^0-9.\-]", "", value)
+    if not value:
+        return 0.0
+    amount = float(value)
+    return -amount if negative else amount
+
+
+class DateParser:
+    """Parse dates in the first of DATE_FORMATS that works, then stick to it."""
+
+    def __init__(self, date_format: Optional[str] = None):
+        """Initialize the parser with an optional fixed format."""
+        self.date_format = date_format
+        # Statements repeat the same few thousand dates, so strptime runs once per date
+        self._cache: Dict[str, str] = {}
+
+    def __call__(self, value: str) -> str:
+        """Convert a statement date to YYYY-MM-DD."""
+        parsed = self._cache.get(value)
+        if parsed is None:
+            parsed = self._cache[value] = self._parse(value.strip())
+        return parsed
+
+    def _parse(self, value: str) -> str:
+        """Parse a date without the cache."""
+        if self.date_format is not None:
+            return datetime.datetime.strptime(value, self.date_format).strftime("%Y-%m-%d")
+        for date_format in DATE_FORMATS:
+            try:
+                parsed = datetime.datetime.strptime(value, date_format)
+            except ValueError:
+                continue
+            self.date_format = date_format
+            return parsed.strftime("%Y-%m-%d")
+        raise ValueError(f"Unrecognised date: {value!r}")
+
+
+def map_columns(header: List[str], columns: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Map transaction fields to CSV header names."""
+    lowered = {name.strip().lower(): name for name in header}
+    mapping = {}
+    for field_name, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                mapping[field_name] = lowered[alias]
+                break
+    if columns:
+        mapping.update(columns)
+    if "date" not in mapping or not ("amount" in mapping or "debit" in mapping or "credit" in mapping):
+        raise ValueError("Statement needs a date column and an amount or debit/credit columns.")
+    return mapping
+
+
+def read_csv(f, columns: Optional[Dict[str, str]] = None,
+             date_format: Optional[str] = None) -> Iterator[Dict]:
+    """Read transactions from a CSV statement, one row at a time.
+
+    ``columns`` maps transaction fields (date, amount, debit, credit,
+    description, category, transaction_type) to header names and overrides
+    the automatic detection.
+    """
+    reader = csv.reader(f)
+    header = next(reader, [])
+    mapping = map_columns(header, columns)
+    positions = {field_name: header.index(column) for field_name, column in mapping.items()
+                 if column in header}
+    if "date" not in positions:
+        raise ValueError(f"Column {mapping['date']!r} not found in statement.")
+    parse_date = DateParser(date_format)
+
+    def value(row, field_name):
+        position = positions.get(field_name)
+        return row[position].strip() if position is not None and position < len(row) else ""
+
+    for row in reader:
+        if not value(row, "date"):
+            continue
+        if "amount" in positions:
+            amount = parse_amount(value(row, "amount"))
+        else:
+            amount = parse_amount(value(row, "credit")) - parse_amount(value(row, "debit"))
+
+        transaction_type = value(row, "transaction_type").lower()
+        if transaction_type:
+            transaction_type = "income" if transaction_type in INCOME_TYPES else "expense"
+        else:
+            transaction_type = "income" if amount > 0 else "expense"
+
+        yield {
+            "amount": abs(amount),
+            "category": value(row, "category") or DEFAULT_CATEGORY,
+            "description": value(row, "description"),
+            "date": parse_date(value(row, "date")),
+            "transaction_type": transaction_type
+        }
+
+
+_OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<\r\n]*)")
+
+
+def read_ofx(f) -> Iterator[Dict]:
+    """Read transactions from an OFX statement (SGML or XML), one record at a time."""
+    record = None
+    for line in f:
+        for closing, tag, value in _OFX_TAG.findall(line):
+            tag = tag.upper()
+            if tag == "STMTTRN":
+                if closing and record is not None:
+                    yield _ofx_transaction(record)
+                    record = None
+                elif not closing:
+                    record = {}
+            elif record is not None and not closing:
+                record[tag] = value.strip()
+    if record:
+        yield _ofx_transaction(record)
+
+
+def _ofx_transaction(record: Dict[str, str]) -> Dict:
+    """Convert the fields of an OFX <STMTTRN> block to a transaction."""
+    amount = parse_amount(record.get("TRNAMT", ""))
+    description = record.get("NAME", "")
+    if record.get("MEMO"):
+        description = f"{description} {record['MEMO']}".strip()
+    return {
+        "amount": abs(amount),
+        "category": DEFAULT_CATEGORY,
+        "description": description,
+        "date": datetime.datetime.strptime(record["DTPOSTED"][:8], "%Y%m%d").strftime("%Y-%m-%d"),
+        "transaction_type": "income" if amount > 0 else "expense"
+    }
+
+
+class PartialImportError(ValueError):
+    """A statement failed partway through; ``stats`` counts the transactions already imported."""
+
+    def __init__(self, message: str, stats: Dict):
+        super().__init__(message)
+        self.stats = stats
+
+
+class StatementImporter:
+    """Import statements into a finance tracker in batches, skipping known transactions."""
+
+    def __init__(self, finance_tracker: FinanceTracker, batch_size: int = 10000,
+                 progress: Optional[Callable[[Dict], None]] = None):
+        """Initialize the importer.
+
+        ``progress`` is called with the running statistics after every batch.
+        """
+        self.finance_tracker = finance_tracker
+        self.batch_size = batch_size
+        self.progress = progress
+        self._known = None
+
+    def _known_transactions(self) -> Counter:
+        """Hash index of the transactions already in the ledger, built on first use."""
+        if self._known is None:
+            self._known = Counter(
+                transaction_key(t.to_dict()) for t in self.finance_tracker.iter_transactions()
+            )
+        return self._known
+
+    def import_records(self, records: Iterable[Dict]) -> Dict:
+        """Import transaction records, committing them in batches.
+
+        A record matching a transaction already in the ledger is skipped.
+        Identical rows within one statement are kept, as long as the ledger
+        does not already hold that many copies.
+
+        A bad record raises ValueError. Batches committed before it stay in
+        the ledger, so the error is a PartialImportError saying how many; once
+        the statement is fixed, importing it again skips them as duplicates.
+        """
+        known = self._known_transactions()
+        stats = {"read": 0, "imported": 0, "duplicates": 0, "seconds": 0.0, "rows_per_second": 0.0}
+        start = time.perf_counter()
+        batch = []
+
+        def commit():
+            self.finance_tracker.add_transactions(batch)
+            stats["imported"] += len(batch)
+            batch.clear()
+            stats["seconds"] = time.perf_counter() - start
+            stats["rows_per_second"] = stats["read"] / stats["seconds"] if stats["seconds"] else 0.0
+            if self.progress:
+                self.progress(dict(stats))
+
+        try:
+            for record in records:
+                stats["read"] += 1
+                key = transaction_key(record)
+                if known[key] > 0:
+                    known[key] -= 1
+                    stats["duplicates"] += 1
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    commit()
+            commit()
+        except ValueError as e:
+            if not stats["imported"]:
+                raise
+            raise PartialImportError(f"{e} (record {stats['read']}); {stats['imported']} transactions "
+                                     "before it were already imported", stats) from e
+        finally:
+            # The new rows are in the ledger now, so later imports must skip them too
+            self._known = None
+        return stats
+
+    def import_file(self, path: str, file_format: Optional[str] = None,
+                    columns: Optional[Dict[str, str]] = None,
+                    date_format: Optional[str] = None) -> Dict:
+        """Import a CSV or OFX statement; the format defaults to the file extension."""
+        if file_format is None:
+            file_format = os.path.splitext(path)[1].lstrip(".").lower()
+        if file_format in ("ofx", "qfx"):
+            with open(path, 'r', encoding="utf-8", errors="replace") as f:
+                return self.import_records(read_ofx(f))
+        if file_format == "csv":
+            with open(path, 'r', newline="", encoding="utf-8-sig") as f:
+                return self.import_records(read_csv(f, columns, date_format))
+        raise ValueError(f"Unsupported statement format: {file_format!r}")
@@ -3,12 +3,60 @@ Investment Tracker Module
 
 This module allows users to track their investments and analyze performance.
 """
+import csv
 import json
 import os
 import datetime
 from dataclasses import dataclass, asdict
-from typing import List, Dict, Optional
-import matplotlib.pyplot as plt
+from typing import Iterable, List, Dict, Mapping, Optional, Union
+from storage import Storage, FsyncPolicy, atomic_write
+from persistence import WriteBehind, ReadOnlyView
+from importer import parse_amount
+
+# Header names recognised in price files, compared case-insensitively
+PRICE_FILE_COLUMNS = {
+    "name": ["name", "symbol", "ticker"],
+    "price": ["price", "current_price", "close", "last"],
+}
+
+
+def read_price_file(path: str) -> Dict[str, float]:
+    """Read a CSV price file with a name (or symbol) and a price column.
+    
+    Rows whose price is blank or not a number (e.g. "N/A") are skipped, so a
+    missing quote never sets a holding's price to 0.
+    """
+    with open(path, 'r', newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = [h.strip().lower() for h in next(reader, [])]
+        positions = {}
+        for field, aliases in PRICE_FILE_COLUMNS.items():
+            matches = [i for i, h in enumerate(header) if h in aliases]
+            if not matches:
+                raise ValueError(f"Price file has no {field} column: {path}")
+            positions[field] = matches[0]
+        
+        prices = {}
+        for row in reader:
+            if len(row) <= max(positions.values()) or not row[positions["name"]].strip():
+                continue
+            cell = row[positions["price"]]
+            # parse_amount reads a cell without digits as 0
+            if not any(c.isdigit() for c in cell):
+                continue
+            try:
+                prices[row[positions["name"]].strip()] = parse_amount(cell)
+            except ValueError:
+                continue
+        return prices
+
+
+def iso_date(value: str) -> Optional[str]:
+    """Get a YYYY-MM-DD date string normalized, or None when it is not a valid date."""
+    try:
+        return datetime.date.fromisoformat(value).isoformat()
+    except (TypeError, ValueError):
+        return None
 
 
 @dataclass
@@ -45,17 +93,85 @@ class Investment:
         return (self.profit_loss() / self.initial_value()) * 100
 
 
-class InvestmentTracker:
+class InvestmentTracker(WriteBehind):
     """Class for tracking investments."""
     
-    def __init__(self, investments_file="investments.json"):
-        """Initialize the investment tracker."""
+    def __init__(self, investments_file="investments.json",
+                 storage: Optional[Storage] = None,
+                 fsync_policy: Optional[FsyncPolicy] = None, write_behind: bool = False,
+                 price_history: bool = False):
+        """Initialize the investment tracker.
+        
+        With ``write_behind=True`` changes are only saved by ``flush()``.
+        
+        Portfolio totals are computed with NumPy over columns of the
+        holdings (see columnar.PortfolioColumns), built on first use.
+        
+        ``price_history=True`` records every price set in a daily price
+        history next to the investments file (see pricehistory), from which
+        portfolio_performance computes returns. Prices are recorded as they
+        are set, independently of write-behind.
+        """
         self.investments_file = investments_file
         self.investments = []
+        self.storage = storage
+        self.fsync_policy = fsync_policy
+        self.price_history_dir = os.path.splitext(investments_file)[0] + ".prices" if price_history else None
+        self._price_history = None
+        self._init_write_behind(write_behind)
         self.load_investments()
     
+    @property
+    def investments(self) -> ReadOnlyView:
+        """All investments, in the order they were added (a read-only view; see add_investment)."""
+        return ReadOnlyView(self._investments)
+    
+    @investments.setter
+    def investments(self, value: Iterable[Investment]):
+        self._investments = list(value)
+        self._rebuild_indexes()
+    
+    def _rebuild_indexes(self):
+        """Rebuild the name and type indexes from the investments list."""
+        self._by_name: Dict[str, List[Investment]] = {}
+        self._by_type: Dict[str, List[Investment]] = {}
+        self._columns = None
+        for inv in self._investments:
+            self._index(inv)
+    
+    def _index(self, investment: Investment):
+        """Add an investment to the indexes."""
+        self._by_name.setdefault(investment.name, []).append(investment)
+        self._by_type.setdefault(investment.investment_type, []).append(investment)
+    
+    def columns(self):
+        """Get the holdings as NumPy columns, built on first use."""
+        from columnar import PortfolioColumns
+        
+        if self._columns is None:
+            self._columns = PortfolioColumns(self._investments)
+        return self._columns
+    
+    @property
+    def price_history(self):
+        """Get the price history, opened on first use; None when it is disabled."""
+        from pricehistory import PriceHistory
+        
+        if self._price_history is None and self.price_history_dir is not None:
+            self._price_history = PriceHistory(self.price_history_dir, fsync_policy=self.fsync_policy)
+        return self._price_history
+    
+    def _record_prices(self, prices: Mapping[str, float], date: Optional[str] = None):
+        """Record prices in the price history, if it is enabled."""
+        if self.price_history_dir is not None:
+            self.price_history.record(prices, date)
+    
     def load_investments(self):
         """Load investments from file."""
+        if self.storage is not None:
+            self.investments = [Investment(**inv) for inv in self.storage.load_records("investments")]
+            return
+        
         if os.path.exists(self.investments_file):
             try:
                 with open(self.investments_file, 'r') as f:
@@ -69,9 +185,17 @@ class InvestmentTracker:
     
     def save_investments(self):
         """Save investments to file."""
-        with open(self.investments_file, 'w') as f:
+        if self.storage is not None:
+            self.storage.replace_records("investments", [inv.to_dict() for inv in self.investments])
+            return
+        
+        with atomic_write(self.investments_file, self.fsync_policy) as f:
             json.dump([inv.to_dict() for inv in self.investments], f, indent=2)
     
+    def _save(self):
+        """Save investments (see WriteBehind)."""
+        self.save_investments()
+    
     def add_investment(self, name: str, investment_type: str, purchase_date: str,
                       purchase_price: float, quantity: float, current_price: float):
         """Add a new investment."""
@@ -85,81 +209,153 @@ class InvestmentTracker:
             last_updated=datetime.datetime.now().strftime("%Y-%m-%d")
         )
         
-        self.investments.append(investment)
-        self.save_investments()
+        self._investments.append(investment)
+        self._index(investment)
+        self._columns = None
+        self._changed()
+        purchased = iso_date(purchase_date)
+        if purchased and purchased < investment.last_updated:
+            self._record_prices({name: investment.purchase_price}, purchased)
+        self._record_prices({name: investment.current_price}, investment.last_updated)
         return investment
     
     def update_investment_price(self, name: str, new_price: float):
-        """Update the current price of an investment."""
-        for inv in self.investments:
-            if inv.name == name:
-                inv.current_price = float(new_price)
-                inv.last_updated = datetime.datetime.now().strftime("%Y-%m-%d")
-                self.save_investments()
-                return True
-        return False
+        """Update the current price of an investment (the first with that name)."""
+        matches = self._by_name.get(name)
+        if not matches:
+            return False
+        inv = matches[0]
+        inv.current_price = float(new_price)
+        inv.last_updated = datetime.datetime.now().strftime("%Y-%m-%d")
+        if self._columns is not None:
+            self._columns.set_prices(self._columns.rows_by_name[name][:1], [inv.current_price])
+        self._changed()
+        self._record_prices({name: inv.current_price}, inv.last_updated)
+        return True
+    
+    def update_prices(self, prices: Union[Mapping[str, float], str], date: Optional[str] = None) -> int:
+        """Set the current prices of many holdings in one pass and save once.
+        
+        ``prices`` maps names to prices, or is the path of a CSV price file
+        (see read_price_file). Every holding with a listed name is updated;
+        unknown names are ignored. Returns the number of holdings updated.
+        A price that is not a number raises ValueError and nothing changes.
+        """
+        if isinstance(prices, str):
+            prices = read_price_file(prices)
+        if date is None:
+            date = datetime.datetime.now().strftime("%Y-%m-%d")
+        
+        # Converted up front, so a bad price leaves every holding unchanged
+        new_prices = {name: float(price) for name, price in prices.items() if name in self._by_name}
+        if not new_prices:
+            return 0
+        with self._lock:
+            updated = 0
+            for name, price in new_prices.items():
+                for inv in self._by_name[name]:
+                    inv.current_price = price
+                    inv.last_updated = date
+                    updated += 1
+            if self._columns is not None:
+                rows = [row for name in new_prices for row in self._columns.rows_by_name[name]]
+                self._columns.set_prices(rows, [price for name, price in new_prices.items()
+                                                for _ in self._columns.rows_by_name[name]])
+            self._changed()
+            self._record_prices(new_prices, date)
+        return updated
     
     def get_all_investments(self):
-        """Get all investments."""
+        """Get all investments (a read-only view)."""
         return self.investments
     
     def get_investment_by_name(self, name: str):
-        """Get an investment by name."""
-        for inv in self.investments:
-            if inv.name == name:
-                return inv
-        return None
+        """Get an investment by name (the first with that name)."""
+        matches = self._by_name.get(name)
+        return matches[0] if matches else None
     
     def get_investments_by_type(self, investment_type: str):
         """Get investments by type."""
-        return [inv for inv in self.investments if inv.investment_type == investment_type]
+        return list(self._by_type.get(investment_type, ()))
     
     def get_portfolio_value(self):
         """Calculate total portfolio value."""
-        return sum(inv.current_value() for inv in self.investments)
+        return self.columns().value()
     
     def get_portfolio_profit_loss(self):
         """Calculate total portfolio profit/loss."""
-        return sum(inv.profit_loss() for inv in self.investments)
+        return self.columns().profit_loss()
     
     def get_portfolio_allocation(self):
-        """Get portfolio allocation by investment type."""
-        allocation = {}
-        total_value = self.get_portfolio_value()
+        """Get portfolio allocation by investment type, in percent of the total value."""
+        return self.columns().allocation()
+    
+    def portfolio_returns(self, start: Optional[str] = None, end: Optional[str] = None):
+        """Get the daily returns of the holdings from the price history, as (dates, returns).
         
-        if total_value == 0:
-            return allocation
+        ``returns[i]`` is the portfolio's return from ``dates[i]`` to
+        ``dates[i + 1]``, weighting each holding by its quantity and counting
+        it only from its purchase date. Returns empty arrays when the price
+        history is disabled.
+        """
+        import numpy as np
+        from pricehistory import daily_returns
         
-        for inv in self.investments:
-            inv_type = inv.investment_type
-            if inv_type not in allocation:
-                allocation[inv_type] = 0
-            allocation[inv_type] += inv.current_value()
+        if self.price_history is None or not self._investments:
+            return np.empty(0, dtype="datetime64[D]"), np.empty(0)
+        names = list(self._by_name)
+        dates, prices = self.price_history.price_matrix(names, start, end)
         
-        # Convert to percentages
-        for inv_type in allocation:
-            allocation[inv_type] = (allocation[inv_type] / total_value) * 100
+        # One column per lot, blank before the lot was bought
+        position = {name: i for i, name in enumerate(names)}
+        lots = prices[:, [position[inv.name] for inv in self._investments]]
+        purchased = np.array([iso_date(inv.purchase_date) or "NaT" for inv in self._investments],
+                             dtype="datetime64[D]")
+        lots[dates[:, None] < purchased[None, :]] = np.nan
+        return dates, daily_returns(lots, self.columns().quantity)
+    
+    def portfolio_performance(self, start: Optional[str] = None, end: Optional[str] = None,
+                              periods_per_year: int = 252) -> Dict:
+        """Get the time-weighted return, annualized volatility and maximum drawdown, in percent."""
+        from pricehistory import time_weighted_return, volatility, max_drawdown
         
-        return allocation
+        dates, returns = self.portfolio_returns(start, end)
+        return {
+            "start": str(dates[0]) if len(dates) else None,
+            "end": str(dates[-1]) if len(dates) else None,
+            "days": len(returns),
+            "time_weighted_return": time_weighted_return(returns) * 100,
+            "volatility": volatility(returns, periods_per_year) * 100,
+            "max_drawdown": max_drawdown(returns) * 100
+        }
     
-    def visualize_portfolio_allocation(self):
-        """Visualize portfolio allocation."""
+    def portfolio_allocation_chart(self):
+        """Get the (kind, data, file name) of the allocation pie chart, or None without investments."""
         allocation = self.get_portfolio_allocation()
-        
         if not allocation:
-            print("No investment data to visualize.")
-            return
+            return None
+        return "pie", {
+            "title": "Portfolio Allocation by Investment Type",
+            "labels": list(allocation.keys()),
+            "values": list(allocation.values())
+        }, 'portfolio_allocation.png'
+    
+    def visualize_portfolio_allocation(self):
+        """Visualize portfolio allocation.
         
-        labels = list(allocation.keys())
-        values = list(allocation.values())
+        Rendered in the background; the returned future resolves once
+        'portfolio_allocation.png' is written.
+        """
+        from charts import default_renderer, report_chart
         
-        plt.figure(figsize=(10, 7))
-        plt.pie(values, labels=labels, autopct='%1.1f%%')
-        plt.title('Portfolio Allocation by Investment Type')
-        plt.axis('equal')
-        plt.savefig('portfolio_allocation.png')
-        plt.close()
-        print("Chart saved as 'portfolio_allocation.png'")
+        chart = self.portfolio_allocation_chart()
+        if chart is None:
+            print("No investment data to visualize.")
+            return None
+        kind, data, filename = chart
+        future = default_renderer().render(kind, data, filename)
+        report_chart(future, filename)
+        return future
 
 
 def main():
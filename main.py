@@ -5,11 +5,17 @@ Main application that integrates all modules of the finance management system.
 """
 import os
 import sys
+import argparse
 from finance_tracker import FinanceTracker
 from budget_planner import BudgetPlanner
+from budget_engine import BUDGET_PERIODS
 from financial_analysis import FinancialAnalysis
 from financial_goals import GoalTracker
 from investment_tracker import InvestmentTracker
+from storage import SQLiteStorage, FsyncPolicy, import_json_files
+from importer import StatementImporter, PartialImportError
+from exporter import EXPORT_FORMATS, export_all
+from persistence import BackgroundFlusher
 
 
 def clear_screen():
@@ -24,48 +30,71 @@ def print_header():
     print("=" * 50)
 
 
-def main_menu():
+def open_storage(db_file):
+    """Open a SQLite database, seeding it from the JSON files on first use."""
+    is_new = not os.path.exists(db_file)
+    storage = SQLiteStorage(db_file)
+    if is_new:
+        import_json_files(storage)
+    return storage
+
+
+def main_menu(storage=None, fsync_policy=None, flush_interval=5.0):
     """Display the main menu and handle user interaction."""
-    # Initialize components
-    tracker = FinanceTracker()
-    planner = BudgetPlanner(tracker)
+    # Initialize components; edits are saved in the background every flush_interval seconds
+    tracker = FinanceTracker(journal=True, storage=storage, fsync_policy=fsync_policy,
+                             write_behind=True, binary_snapshot=True)
+    planner = BudgetPlanner(tracker, storage=storage, fsync_policy=fsync_policy, write_behind=True)
+    planner.subscribe(print_budget_alert)
     analysis = FinancialAnalysis(tracker)
-    goal_tracker = GoalTracker(tracker)
-    investment_tracker = InvestmentTracker()
+    goal_tracker = GoalTracker(tracker, storage=storage, fsync_policy=fsync_policy, write_behind=True)
+    investment_tracker = InvestmentTracker(storage=storage, fsync_policy=fsync_policy,
+                                           write_behind=True, price_history=True)
+    flusher = BackgroundFlusher([tracker, planner, goal_tracker, investment_tracker], flush_interval)
+    flusher.start()
     
-    while True:
-        clear_screen()
-        print_header()
-        print(f"\nCurrent Balance: Rs{tracker.get_balance():.2f}")
-        
-        print("\nMAIN MENU:")
-        print("1. Transaction Management")
-        print("2. Budget Planning")
-        print("3. Financial Analysis")
-        print("4. Financial Goals")
-        print("5. Investment Tracker")
-        print("6. Settings")
-        print("7. Exit")
-        
-        choice = input("\nEnter your choice (1-7): ")
-        
-        if choice == '1':
-            transaction_menu(tracker)
-        elif choice == '2':
-            budget_menu(planner)
-        elif choice == '3':
-            analysis_menu(analysis)
-        elif choice == '4':
-            goal_menu(goal_tracker)
-        elif choice == '5':
-            investment_menu(investment_tracker)
-        elif choice == '6':
-            settings_menu(tracker)
-        elif choice == '7':
-            print("\nThank you for using the Personal Finance Manager!")
-            sys.exit(0)
-        else:
-            input("Invalid choice. Press Enter to continue...")
+    try:
+        while True:
+            clear_screen()
+            print_header()
+            print(f"\nCurrent Balance: Rs{tracker.get_balance():.2f}")
+            
+            print("\nMAIN MENU:")
+            print("1. Transaction Management")
+            print("2. Budget Planning")
+            print("3. Financial Analysis")
+            print("4. Financial Goals")
+            print("5. Investment Tracker")
+            print("6. Settings")
+            print("7. Exit")
+            
+            choice = input("\nEnter your choice (1-7): ")
+            
+            if choice == '1':
+                transaction_menu(tracker)
+            elif choice == '2':
+                budget_menu(planner)
+            elif choice == '3':
+                analysis_menu(analysis, investment_tracker)
+            elif choice == '4':
+                goal_menu(goal_tracker)
+            elif choice == '5':
+                investment_menu(investment_tracker)
+            elif choice == '6':
+                settings_menu(tracker, planner, goal_tracker, investment_tracker)
+            elif choice == '7':
+                break
+            else:
+                input("Invalid choice. Press Enter to continue...")
+    finally:
+        # Save whatever the background flusher has not written yet, even after Ctrl+C;
+        # the journal is folded into the data file only once it outgrows its threshold
+        flusher.stop()
+        if fsync_policy is not None:
+            fsync_policy.flush()
+    
+    print("\nThank you for using the Personal Finance Manager!")
+    sys.exit(0)
 
 
 def transaction_menu(tracker):
@@ -89,8 +118,11 @@ def transaction_menu(tracker):
             date = input("Enter date (YYYY-MM-DD) or leave blank for today: ")
             if not date:
                 date = None
-            tracker.add_transaction(amount, category, description, date, "income")
-            print("Income added successfully!")
+            try:
+                tracker.add_transaction(amount, category, description, date, "income")
+                print("Income added successfully!")
+            except ValueError:
+                print("Invalid date format. Use YYYY-MM-DD.")
             input("Press Enter to continue...")
             
         elif choice == '2':
@@ -100,8 +132,11 @@ def transaction_menu(tracker):
             date = input("Enter date (YYYY-MM-DD) or leave blank for today: ")
             if not date:
                 date = None
-            tracker.add_transaction(amount, category, description, date, "expense")
-            print("Expense added successfully!")
+            try:
+                tracker.add_transaction(amount, category, description, date, "expense")
+                print("Expense added successfully!")
+            except ValueError:
+                print("Invalid date format. Use YYYY-MM-DD.")
             input("Press Enter to continue...")
             
         elif choice == '3':
@@ -149,8 +184,17 @@ def budget_menu(planner):
         if choice == '1':
             category = input("Enter category: ")
             amount = float(input("Enter budget amount: Rs"))
-            period = input("Enter period (monthly/weekly): ")
-            planner.create_budget(category, amount, period)
+            period = input(f"Enter period ({'/'.join(BUDGET_PERIODS)}): ")
+            if period not in BUDGET_PERIODS:
+                input("Invalid period. Press Enter to continue...")
+                continue
+            start_date = input("Enter start date (YYYY-MM-DD, default today): ") or None
+            end_date = input("Enter end date (YYYY-MM-DD" + (")" if period == "custom" else ", optional): ")) or None
+            try:
+                planner.create_budget(category, amount, period, start_date, end_date)
+            except ValueError as e:
+                input(f"{e}. Press Enter to continue...")
+                continue
             print(f"Budget for {category} created successfully!")
             input("Press Enter to continue...")
             
@@ -165,7 +209,7 @@ def budget_menu(planner):
             status = planner.calculate_budget_status()
             print("\n----- Budget Status -----")
             for category, data in status.items():
-                print(f"{category}:")
+                print(f"{category}: {data['start']} to {data['end']}")
                 print(f"  Budget: Rs{data['budget']:.2f}")
                 print(f"  Spent: Rs{data['spent']:.2f}")
                 print(f"  Remaining: Rs{data['remaining']:.2f}")
@@ -179,7 +223,7 @@ def budget_menu(planner):
             input("Invalid choice. Press Enter to continue...")
 
 
-def analysis_menu(analysis):
+def analysis_menu(analysis, investment_tracker=None):
     """Handle financial analysis."""
     while True:
         clear_screen()
@@ -188,9 +232,10 @@ def analysis_menu(analysis):
         print("1. Income vs Expenses Analysis")
         print("2. Category Trend Analysis")
         print("3. Savings Rate Analysis")
-        print("4. Back to Main Menu")
+        print("4. Render Full Dashboard")
+        print("5. Back to Main Menu")
         
-        choice = input("\nEnter your choice (1-4): ")
+        choice = input("\nEnter your choice (1-5): ")
         
         if choice == '1':
             import datetime
@@ -218,6 +263,16 @@ def analysis_menu(analysis):
             input("\nPress Enter to continue...")
             
         elif choice == '4':
+            from dashboard import render_dashboard
+            output_dir = input("Enter output directory (default: dashboard): ") or "dashboard"
+            report = input("Enter report file, .html or .pdf (default: dashboard.html): ") or "dashboard.html"
+            print("Rendering charts...")
+            paths = render_dashboard(analysis.finance_tracker, investment_tracker,
+                                     output_dir=output_dir, report=report)
+            print(f"Saved {len(paths) - 1} charts and the report '{paths[-1]}'.")
+            input("\nPress Enter to continue...")
+            
+        elif choice == '5':
             return
             
         else:
@@ -318,9 +373,11 @@ def investment_menu(investment_tracker):
         print("3. View All Investments")
         print("4. View Investment Details")
         print("5. View Portfolio Allocation")
-        print("6. Back to Main Menu")
+        print("6. Import Price File")
+        print("7. View Portfolio Performance")
+        print("8. Back to Main Menu")
         
-        choice = input("\nEnter your choice (1-6): ")
+        choice = input("\nEnter your choice (1-8): ")
         
         if choice == '1':
             name = input("Enter investment name/symbol: ")
@@ -389,13 +446,53 @@ def investment_menu(investment_tracker):
             input("\nPress Enter to continue...")
             
         elif choice == '6':
+            path = input("Enter path of the price CSV (name/symbol and price columns): ")
+            try:
+                updated = investment_tracker.update_prices(path)
+                print(f"Updated the price of {updated} holdings.")
+            except (OSError, ValueError) as e:
+                print(f"Error reading price file: {e}")
+            input("\nPress Enter to continue...")
+            
+        elif choice == '7':
+            start = input("Enter start date (YYYY-MM-DD, blank for all history): ").strip() or None
+            end = input("Enter end date (YYYY-MM-DD, blank for today): ").strip() or None
+            try:
+                performance = investment_tracker.portfolio_performance(start, end)
+            except ValueError:
+                print("Invalid date format. Use YYYY-MM-DD.")
+                input("\nPress Enter to continue...")
+                continue
+            if performance["days"] == 0:
+                print("Not enough price history yet; prices are recorded each time they are updated.")
+            else:
+                print(f"\n----- Performance {performance['start']} to {performance['end']} -----")
+                print(f"Priced Days: {performance['days']}")
+                print(f"Time-Weighted Return: {performance['time_weighted_return']:.2f}%")
+                print(f"Annualized Volatility: {performance['volatility']:.2f}%")
+                print(f"Maximum Drawdown: {performance['max_drawdown']:.2f}%")
+            input("\nPress Enter to continue...")
+            
+        elif choice == '8':
             return
             
         else:
             input("Invalid choice. Press Enter to continue...")
 
 
-def settings_menu(tracker):
+def print_budget_alert(alert):
+    """Warn that a new expense pushed a budget past an alert threshold."""
+    print(f"Budget alert: {alert.category} ({alert.period}) is at {alert.percentage:.0f}% of "
+          f"Rs{alert.budget:.2f} for {alert.start} to {alert.end}")
+
+
+def print_import_progress(stats):
+    """Print a running counter while a statement is imported."""
+    print(f"\rRead {stats['read']} rows, imported {stats['imported']} "
+          f"({stats['rows_per_second']:.0f} rows/s)", end="", flush=True)
+
+
+def settings_menu(tracker, planner=None, goal_tracker=None, investment_tracker=None):
     """Handle application settings."""
     while True:
         clear_screen()
@@ -408,15 +505,40 @@ def settings_menu(tracker):
         choice = input("\nEnter your choice (1-3): ")
         
         if choice == '1':
-            print("Data is automatically saved to:")
-            print(f"- Transactions: {tracker.data_file}")
-            print("- Budgets: budgets.json")
-            print("- Goals: goals.json")
-            print("- Investments: investments.json")
+            file_format = input(f"Format ({'/'.join(EXPORT_FORMATS)}) [csv]: ").strip().lower() or "csv"
+            directory = input("Export directory [export]: ").strip() or "export"
+            start = input("Start date (YYYY-MM-DD, leave empty for all): ").strip() or None
+            end = input("End date (YYYY-MM-DD, leave empty for all): ").strip() or None
+            categories = input("Categories (comma separated, leave empty for all): ").strip()
+            categories = [c.strip() for c in categories.split(",") if c.strip()] or None
+            try:
+                counts = export_all(directory, file_format, tracker, planner, goal_tracker,
+                                    investment_tracker, start, end, categories)
+            except (ValueError, OSError) as e:
+                print(f"Export failed: {e}")
+            else:
+                print(f"Exported to {directory}:")
+                for name, count in counts.items():
+                    print(f"- {name.capitalize()}: {count} rows")
             input("Press Enter to continue...")
             
         elif choice == '2':
-            print("Data import functionality not implemented yet.")
+            path = input("Enter path to CSV or OFX statement: ").strip()
+            if os.path.exists(path):
+                importer = StatementImporter(tracker, progress=print_import_progress)
+                try:
+                    stats = importer.import_file(path)
+                except PartialImportError as e:
+                    print(f"\nImport stopped: {e}.")
+                    print("Fix the statement and import it again; the rows already imported are skipped.")
+                except ValueError as e:
+                    print(f"\nImport failed: {e}")
+                else:
+                    print(f"\nImported {stats['imported']} transactions "
+                          f"({stats['duplicates']} duplicates skipped) "
+                          f"in {stats['seconds']:.1f}s ({stats['rows_per_second']:.0f} rows/s)")
+            else:
+                print("File not found.")
             input("Press Enter to continue...")
             
         elif choice == '3':
@@ -427,4 +549,14 @@ def settings_menu(tracker):
 
 
 if __name__ == "__main__":
-    main_menu()
+    parser = argparse.ArgumentParser(description="Personal Finance Manager")
+    parser.add_argument("--db", help="store data in this SQLite database instead of the JSON files")
+    parser.add_argument("--fsync-every", type=int, default=1, metavar="N",
+                        help="sync data files to disk every N writes (0 = only with --fsync-interval)")
+    parser.add_argument("--fsync-interval", type=float, metavar="SECONDS",
+                        help="sync data files to disk at least this often")
+    parser.add_argument("--flush-interval", type=float, default=5.0, metavar="SECONDS",
+                        help="save edits in the background this often (default: 5)")
+    args = parser.parse_args()
+    main_menu(open_storage(args.db) if args.db else None,
+              FsyncPolicy(args.fsync_every, args.fsync_interval), args.flush_interval)
@@ -0,0 +1,134 @@
+"""
+Persistence Module
+
+This module lets the trackers defer saving (write-behind): mutations mark a
+tracker dirty and the data is written once, when the tracker is flushed.
+"""
+import threading
+from collections.abc import Sequence
+from contextlib import contextmanager
+from typing import Collection, Iterable
+
+
+class WriteBehind:
+    """Mixin for trackers that can defer saving until they are flushed.
+
+    Mutations call ``_changed()``. That saves immediately unless the tracker
+    was created with ``write_behind=True`` or is inside a ``batch()`` block,
+    in which case it only marks the tracker dirty and ``flush()`` saves once.
+    """
+
+    def _init_write_behind(self, write_behind: bool = False):
+        """Set up the write-behind state; call before loading data."""
+        self.write_behind = write_behind
+        self.dirty = False
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+
+    def _save(self):
+        """Write the tracker's data."""
+        raise NotImplementedError
+
+    @property
+    def deferring(self) -> bool:
+        """Whether saves are currently deferred."""
+        return self.write_behind or self._batch_depth > 0
+
+    def _changed(self):
+        """Save after a mutation, or mark the tracker dirty when saves are deferred."""
+        with self._lock:
+            if self.deferring:
+                self.dirty = True
+            else:
+                self._save()
+
+    def flush(self):
+        """Save if there are unsaved changes."""
+        with self._lock:
+            if not self.dirty:
+                return
+            # Cleared first, so that a save which reads the data back does not flush again
+            self.dirty = False
+            try:
+                self._save()
+            except BaseException:
+                self.dirty = True
+                raise
+
+    @contextmanager
+    def batch(self):
+        """Defer saving until the block ends, then save once."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+
+class ReadOnlyView(Sequence):
+    """Live, read-only view of a tracker's records.
+
+    The trackers keep indexes over their records, so changes go through
+    their methods; the view has no append or item assignment to bypass them.
+    Nothing is copied: the view always shows the current records.
+    """
+
+    __slots__ = ("_items",)
+
+    def __init__(self, items: Collection):
+        """Wrap a list, or the values of a dict."""
+        self._items = items
+
+    def __getitem__(self, index):
+        if isinstance(self._items, Sequence):
+            return self._items[index]
+        return list(self._items)[index]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __repr__(self) -> str:
+        return f"ReadOnlyView({list(self._items)!r})"
+
+
+class BackgroundFlusher:
+    """Flush write-behind trackers from a daemon thread every ``interval`` seconds."""
+
+    def __init__(self, trackers: Iterable[WriteBehind], interval: float = 5.0):
+        """Initialize the flusher; call ``start()`` to begin flushing."""
+        self.trackers = list(trackers)
+        self.interval = interval
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="flusher", daemon=True)
+
+    def _run(self):
+        """Flush until stopped."""
+        while not self._done.wait(self.interval):
+            self.flush()
+
+    def start(self):
+        """Start the background thread."""
+        self._thread.start()
+
+    def flush(self):
+        """Flush every tracker now."""
+        for tracker in self.trackers:
+            try:
+                tracker.flush()
+            except Exception as e:
+                # Keep the thread alive: the unsaved changes are retried on the next flush
+                print(f"Error saving data: {e}")
+
+    def stop(self):
+        """Stop the thread and flush one last time."""
+        self._done.set()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.flush()
@@ -0,0 +1,273 @@
+"""
+Price History Module
+
+This module keeps the daily price history of every holding and computes
+portfolio returns from it.
+
+Prices are appended to a binary journal of fixed-size (holding, day, price)
+records and periodically compacted into two little-endian column files:
+``days.<generation>.i4`` (days since 1970-01-01) and
+``prices.<generation>.f8``. Rows are grouped by holding and sorted by day,
+and ``_index.json`` records the holding names and where each holding's rows
+start, so the files are memory-mapped and a range query is a binary search
+within one holding's rows. Compaction writes a new generation and then
+replaces the index atomically, so a crash never leaves a mixed snapshot.
+"""
+import os
+import json
+import datetime
+from typing import Iterable, Mapping, Optional, Tuple, Union
+import numpy as np
+from storage import FsyncPolicy, atomic_write, append_bytes, fsync_path
+from columnfile import date_to_days
+
+INDEX_FILE = "_index.json"
+JOURNAL_FILE = "journal.bin"
+
+# One journal record: holding code, days since 1970-01-01 and price
+JOURNAL_RECORD = np.dtype([("holding", "<i4"), ("day", "<i4"), ("price", "<f8")])
+
+DateArg = Union[str, datetime.date, None]
+
+
+def _days(value: DateArg) -> Optional[int]:
+    """Convert a date argument to days since 1970-01-01."""
+    if value is None:
+        return None
+    if isinstance(value, datetime.date):
+        value = value.isoformat()
+    return date_to_days(value)
+
+
+def _last_per_day(holding: np.ndarray, day: np.ndarray, price: np.ndarray):
+    """Sort rows by holding and day, keeping the last row written for each pair."""
+    order = np.lexsort((np.arange(len(holding)), day, holding))
+    holding, day, price = holding[order], day[order], price[order]
+    last = np.ones(len(holding), dtype=bool)
+    last[:-1] = (holding[1:] != holding[:-1]) | (day[1:] != day[:-1])
+    return holding[last], day[last], price[last]
+
+
+def daily_returns(prices: np.ndarray, quantities: np.ndarray) -> np.ndarray:
+    """Get the portfolio return between consecutive rows of a (dates x holdings) price matrix.
+
+    Each return only counts holdings priced on both days (NaN marks a
+    missing price), so buying or selling a holding does not show up as a
+    gain or loss.
+    """
+    previous, current = prices[:-1], prices[1:]
+    both = ~np.isnan(previous) & ~np.isnan(current)
+    gain = np.where(both, (current - previous) * quantities, 0.0).sum(axis=1)
+    base = np.where(both, previous * quantities, 0.0).sum(axis=1)
+    return np.divide(gain, base, out=np.zeros_like(gain), where=base != 0)
+
+
+def time_weighted_return(returns: np.ndarray) -> float:
+    """Chain periodic returns into the time-weighted return."""
+    return float(np.prod(1 + returns) - 1)
+
+
+def volatility(returns: np.ndarray, periods_per_year: int = 252) -> float:
+    """Get the annualized standard deviation of periodic returns."""
+    if len(returns) < 2:
+        return 0.0
+    return float(np.std(returns, ddof=1) * np.sqrt(periods_per_year))
+
+
+def max_drawdown(returns: np.ndarray) -> float:
+    """Get the largest fall from a peak of the growth of 1 (0 or negative)."""
+    wealth = np.concatenate(([1.0], np.cumprod(1 + returns)))
+    return float((wealth / np.maximum.accumulate(wealth) - 1).min())
+
+
+class PriceHistory:
+    """Append-only daily prices per holding, memory-mapped from a directory."""
+
+    def __init__(self, directory: str, compact_threshold: int = 10000,
+                 fsync_policy: Optional[FsyncPolicy] = None):
+        """Open (or create) a price history directory.
+
+        The journal is folded into the column files once it holds
+        ``compact_threshold`` records and at least a quarter as many as the
+        column files.
+        """
+        self.directory = directory
+        self.compact_threshold = compact_threshold
+        self.fsync_policy = fsync_policy
+        self.journal_file = os.path.join(directory, JOURNAL_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        # A crash can leave a partial record at the end; drop it so appends stay aligned
+        self.journal_entries = 0
+        if os.path.exists(self.journal_file):
+            size = os.path.getsize(self.journal_file)
+            self.journal_entries = size // JOURNAL_RECORD.itemsize
+            if size % JOURNAL_RECORD.itemsize:
+                os.truncate(self.journal_file, self.journal_entries * JOURNAL_RECORD.itemsize)
+        self._open_snapshot()
+        # Drop records whose holding never reached the index, before a new holding takes its code
+        if self.journal_entries and len(self._read_journal()) < self.journal_entries:
+            self.compact()
+
+    def _open_snapshot(self):
+        """Read the index and map the current generation of column files."""
+        index = {"generation": 0, "names": [], "offsets": [0]}
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                index = json.load(f)
+        self.generation = index["generation"]
+        self.names = index["names"]
+        self._codes = {name: code for code, name in enumerate(self.names)}
+        self._offsets = np.asarray(index["offsets"], dtype=np.int64)
+        self._day = self._map(f"days.{self.generation}.i4", "<i4")
+        self._price = self._map(f"prices.{self.generation}.f8", "<f8")
+        self._journal = None
+
+    def _map(self, filename: str, dtype: str) -> np.ndarray:
+        """Memory-map a column file (an empty array when it is missing or empty)."""
+        path = os.path.join(self.directory, filename)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def _write_index(self, generation: int, offsets: np.ndarray, sync: bool = False):
+        """Replace the index with the current names and the given generation and offsets."""
+        with atomic_write(os.path.join(self.directory, INDEX_FILE), self.fsync_policy, sync=sync) as f:
+            json.dump({"generation": generation, "names": self.names, "offsets": offsets.tolist()}, f)
+
+    def _read_journal(self) -> np.ndarray:
+        """Read the journal's records, skipping holdings missing from the index."""
+        if not os.path.exists(self.journal_file):
+            return np.empty(0, dtype=JOURNAL_RECORD)
+        records = np.fromfile(self.journal_file, dtype=JOURNAL_RECORD)
+        # Names are indexed before their records are appended, but a crash can lose the index write
+        return records[records["holding"] < len(self.names)]
+
+    def _journal_columns(self):
+        """Get the journal as sorted (day, price, offsets by holding) columns, read on first use."""
+        if self._journal is None:
+            records = self._read_journal()
+            holding, day, price = _last_per_day(records["holding"], records["day"], records["price"])
+            self._journal = (day, price, np.searchsorted(holding, np.arange(len(self.names) + 1)))
+        return self._journal
+
+    @property
+    def rows(self) -> int:
+        """Number of prices in the column files."""
+        return len(self._day)
+
+    def record(self, prices: Mapping[str, float], date: DateArg = None):
+        """Append the prices of many holdings on one date (today by default)."""
+        if not prices:
+            return
+        new_names = [name for name in prices if name not in self._codes]
+        if new_names:
+            for name in new_names:
+                self._codes[name] = len(self.names)
+                self.names.append(name)
+            # New holdings start with no rows
+            self._offsets = np.concatenate((self._offsets, np.repeat(self._offsets[-1], len(new_names))))
+            self._write_index(self.generation, self._offsets)
+
+        records = np.empty(len(prices), dtype=JOURNAL_RECORD)
+        records["holding"] = [self._codes[name] for name in prices]
+        records["day"] = _days(date if date is not None else datetime.date.today())
+        records["price"] = [float(price) for price in prices.values()]
+        append_bytes(self.journal_file, records.tobytes(), self.fsync_policy)
+        self.journal_entries += len(records)
+        self._journal = None
+
+        if self.journal_entries >= max(self.compact_threshold, self.rows // 4):
+            self.compact()
+
+    def compact(self):
+        """Fold the journal into a new generation of column files."""
+        if not self.journal_entries:
+            return
+        records = self._read_journal()
+        # Column rows first and journal records after, so the journal's price is the one kept
+        holding = np.concatenate((np.repeat(np.arange(len(self.names)), np.diff(self._offsets)),
+                                  records["holding"]))
+        day = np.concatenate((self._day, records["day"]))
+        price = np.concatenate((self._price, records["price"]))
+        holding, day, price = _last_per_day(holding, day, price)
+
+        generation = self.generation + 1
+        for filename, values in ((f"days.{generation}.i4", day.astype("<i4")),
+                                 (f"prices.{generation}.f8", price.astype("<f8"))):
+            with open(os.path.join(self.directory, filename), 'wb') as f:
+                values.tofile(f)
+                f.flush()
+                os.fsync(f.fileno())
+        # The journal is removed next, so the new index must reach the disk first
+        self._write_index(generation, np.searchsorted(holding, np.arange(len(self.names) + 1)), sync=True)
+        os.remove(self.journal_file)
+        fsync_path(self.directory)
+        self.journal_entries = 0
+
+        previous = self.generation
+        self.close()
+        for filename in (f"days.{previous}.i4", f"prices.{previous}.f8"):
+            path = os.path.join(self.directory, filename)
+            if os.path.exists(path):
+                os.remove(path)
+        self._open_snapshot()
+
+    def _series(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get a holding's days and prices, sorted by day (views into the maps when possible)."""
+        code = self._codes.get(name)
+        if code is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64)
+        days = self._day[self._offsets[code]:self._offsets[code + 1]]
+        prices = self._price[self._offsets[code]:self._offsets[code + 1]]
+
+        journal_day, journal_price, offsets = self._journal_columns()
+        start, end = offsets[code], offsets[code + 1]
+        if start < end:
+            keep = ~np.isin(days, journal_day[start:end])
+            days = np.concatenate((days[keep], journal_day[start:end]))
+            prices = np.concatenate((prices[keep], journal_price[start:end]))
+            order = np.argsort(days, kind="stable")
+            days, prices = days[order], prices[order]
+        return days, prices
+
+    def history(self, name: str, start: DateArg = None,
+                end: DateArg = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get a holding's prices from start to end (inclusive) as (datetime64[D] dates, prices)."""
+        days, prices = self._series(name)
+        low = 0 if start is None else np.searchsorted(days, _days(start), side="left")
+        high = len(days) if end is None else np.searchsorted(days, _days(end), side="right")
+        return np.asarray(days[low:high]).astype("datetime64[D]"), np.array(prices[low:high])
+
+    def price_matrix(self, names: Iterable[str], start: DateArg = None,
+                     end: DateArg = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the prices of many holdings on every date any of them has a price.
+
+        Returns (dates, matrix) with one row per date and one column per name.
+        Each price is the holding's latest on or before the date, and NaN
+        before its first price.
+        """
+        series = [self._series(name) for name in names]
+        if not series:
+            return np.empty(0, dtype="datetime64[D]"), np.empty((0, 0))
+        days = np.unique(np.concatenate([d for d, _ in series]))
+        if start is not None:
+            days = days[days >= _days(start)]
+        if end is not None:
+            days = days[days <= _days(end)]
+
+        matrix = np.full((len(days), len(series)), np.nan)
+        for column, (holding_days, prices) in enumerate(series):
+            if not len(holding_days):
+                continue
+            rows = np.searchsorted(holding_days, days, side="right") - 1
+            priced = rows >= 0
+            matrix[priced, column] = prices[rows[priced]]
+        return days.astype("datetime64[D]"), matrix
+
+    def close(self):
+        """Unmap the column files."""
+        self._day = np.empty(0, dtype="<i4")
+        self._price = np.empty(0, dtype="<f8")
+        self._journal = None
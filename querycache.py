@@ -0,0 +1,57 @@
+"""
+Query Cache Module
+
+This module memoizes report and analysis results. Each entry is stored with
+the version of the data it was computed from and is recomputed once that
+version changes, so a cached result is never stale.
+
+Queries over a range of months are versioned by those months only (see
+``FinanceTracker.months_version``): a new transaction invalidates the months
+it falls in, and results for closed months stay cached until a back-dated
+transaction arrives.
+"""
+import copy
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class QueryCache:
+    """Bounded LRU cache of query results keyed by (query, parameters)."""
+
+    def __init__(self, maxsize: int = 256):
+        """Initialize an empty cache holding at most ``maxsize`` results."""
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        """Get the result for ``key`` at ``version``, computing and caching it when missing or stale.
+
+        Callers get a copy, so changing a returned report cannot corrupt the cache.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return copy.deepcopy(value)
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,680 @@
+"""
+Storage Module
+
+This module provides pluggable storage backends that can replace the JSON files
+used by the finance tracker, budget planner, goal tracker and investment tracker.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional
+from columnfile import ColumnReader, date_to_days, iso_date, parse_iso_date
+
+
+class Storage:
+    """Interface implemented by storage backends."""
+
+    def load_records(self, table: str) -> List[Dict]:
+        """Load all records of a table (budgets, goals or investments)."""
+        raise NotImplementedError
+
+    def replace_records(self, table: str, records: Iterable[Dict]):
+        """Replace the contents of a table with the given records."""
+        raise NotImplementedError
+
+    def iter_transactions(self, category: Optional[str] = None,
+                          transaction_type: Optional[str] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over transactions matching the filters, in insertion order."""
+        raise NotImplementedError
+
+    def insert_transactions(self, records: Iterable[Dict]):
+        """Append transactions to the ledger."""
+        raise NotImplementedError
+
+    def replace_transactions(self, records: Iterable[Dict]):
+        """Replace the whole ledger."""
+        raise NotImplementedError
+
+    def count_transactions(self) -> int:
+        """Count stored transactions."""
+        return sum(1 for _ in self.iter_transactions())
+
+    def totals_by_type(self, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> Dict[str, float]:
+        """Get the total amount per transaction type."""
+        totals = {}
+        for r in self.iter_transactions(start_date=start_date, end_date=end_date):
+            totals[r["transaction_type"]] = totals.get(r["transaction_type"], 0) + r["amount"]
+        return totals
+
+    def totals_by_category(self, transaction_type: str = "expense",
+                           start_date: Optional[str] = None,
+                           end_date: Optional[str] = None) -> Dict[str, float]:
+        """Get the total amount per category for a transaction type."""
+        totals = {}
+        for r in self.iter_transactions(transaction_type=transaction_type,
+                                        start_date=start_date, end_date=end_date):
+            totals[r["category"]] = totals.get(r["category"], 0) + r["amount"]
+        return totals
+
+    def close(self):
+        """Release any resources held by the backend."""
+
+
+TRANSACTION_COLUMNS = ["amount", "category", "description", "date", "transaction_type"]
+
+_WHITESPACE = re.compile(r"\s*")
+
+
+def iter_json_array(f, chunk_size: int = 1 << 16) -> Iterator:
+    """Decode the items of a top-level JSON array from a file one at a time.
+    
+    Only one chunk of text plus the item being decoded is held in memory, so
+    arrays larger than RAM can be processed.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    eof = False
+    state = "start"  # then "first", "value" or "separator"
+    
+    while True:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        need_more = pos == len(buffer)
+        
+        if not need_more:
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise json.JSONDecodeError("Expecting '['", buffer, pos)
+                pos += 1
+                state = "first"
+                continue
+            if char == "]" and state in ("first", "separator"):
+                return
+            if state == "separator":
+                if char != ",":
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+                pos += 1
+                state = "value"
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                need_more = True
+            else:
+                # A number cut at the chunk boundary decodes as a shorter number,
+                # so only accept an item once the delimiter after it is in the buffer
+                delimiter = _WHITESPACE.match(buffer, end).end()
+                if eof or (delimiter < len(buffer) and buffer[delimiter] in ",]"):
+                    yield item
+                    pos = end
+                    state = "separator"
+                    continue
+                need_more = True
+        
+        if eof:
+            raise json.JSONDecodeError("Unterminated array", buffer, pos)
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buffer = buffer[pos:] + chunk
+        pos = 0
+
+
+def write_json_array(f, records: Iterable[Dict]):
+    """Write records as a JSON array with one record per line.
+    
+    Records are encoded one at a time with the C encoder, which is much
+    faster than ``json.dump(..., indent=2)`` and never builds the whole
+    document in memory.
+    """
+    f.write("[")
+    separator = "\n  "
+    for record in records:
+        f.write(separator)
+        f.write(json.dumps(record))
+        separator = ",\n  "
+    f.write("\n]\n")
+
+
+
+def fsync_path(path: str):
+    """Flush a file or directory to disk."""
+    if os.path.isdir(path):
+        if not hasattr(os, "O_DIRECTORY"):
+            return  # Windows cannot open directories; its renames need no directory sync
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    else:
+        fd = os.open(path, os.O_RDWR)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class FsyncPolicy:
+    """Decide which file writes are flushed to disk with fsync.
+    
+    With the defaults every write is synced. ``every_writes=N`` syncs every
+    Nth write and ``every_seconds=T`` syncs the first write after T seconds
+    without one; when both are given, whichever comes first wins. Use
+    ``every_writes=0`` with no interval to never sync (fastest, for bulk
+    loads). A sync also flushes the files written since the previous one, so
+    at most the writes of one unsynced window can be lost in a power failure.
+    Writes are atomic either way: a crash never leaves a truncated file.
+    """
+
+    def __init__(self, every_writes: int = 1, every_seconds: Optional[float] = None):
+        """Initialize the policy."""
+        self.every_writes = every_writes
+        self.every_seconds = every_seconds
+        self._writes = 0
+        self._last_sync = time.monotonic()
+        self._pending = set()
+        # Shared by the trackers, which the background flusher saves from another thread
+        self._lock = threading.RLock()
+
+    def due(self) -> bool:
+        """Count a write and decide whether it must be synced."""
+        with self._lock:
+            self._writes += 1
+            if self.every_writes and self._writes >= self.every_writes:
+                return True
+            return (self.every_seconds is not None
+                    and time.monotonic() - self._last_sync >= self.every_seconds)
+
+    def defer(self, path: str):
+        """Remember a file written without fsync."""
+        with self._lock:
+            self._pending.add(os.path.abspath(path))
+
+    def synced(self, path: Optional[str] = None):
+        """Record that a file was synced, and sync the files written before it."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self._writes = 0
+            self._last_sync = time.monotonic()
+        directories = set()
+        if path is not None:
+            path = os.path.abspath(path)
+            pending.discard(path)
+            directories.add(os.path.dirname(path))
+        for pending_path in pending:
+            if os.path.exists(pending_path):
+                fsync_path(pending_path)
+            directories.add(os.path.dirname(pending_path))
+        for directory in directories:
+            fsync_path(directory)
+
+    def flush(self):
+        """Sync every file written since the last sync."""
+        with self._lock:
+            has_pending = bool(self._pending)
+        if has_pending:
+            self.synced()
+
+
+def _new_file_mode() -> int:
+    """Get the permissions open() would give a new file under the current umask."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+@contextmanager
+def atomic_write(path: str, policy: Optional[FsyncPolicy] = None, sync: bool = False,
+                 newline: Optional[str] = None):
+    """Open a temporary file that replaces ``path`` only once it is fully written.
+    
+    The file is synced when the policy says so (every write without a
+    policy), or always with ``sync=True``. If writing fails the original file
+    is left untouched.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        # mkstemp creates the file private to the owner; keep the usual permissions
+        mode = os.stat(path).st_mode if os.path.exists(path) else _new_file_mode()
+        os.chmod(temp_path, mode & 0o7777)
+        with os.fdopen(fd, 'w', newline=newline) as f:
+            yield f
+            f.flush()
+            durable = sync or policy is None or policy.due()
+            if durable:
+                os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    if policy is None:
+        fsync_path(directory)
+    elif durable:
+        policy.synced(path)
+    else:
+        policy.defer(path)
+
+
+def append_text(path: str, text: str, policy: Optional[FsyncPolicy] = None):
+    """Append text to a file, syncing it when the policy says so (always without one)."""
+    _append(path, text, 'a', policy)
+
+
+def append_bytes(path: str, data: bytes, policy: Optional[FsyncPolicy] = None):
+    """Append bytes to a file, syncing it when the policy says so (always without one)."""
+    _append(path, data, 'ab', policy)
+
+
+def truncate_partial_line(path: str, chunk_size: int = 1 << 16):
+    """Drop the bytes after the last newline, left by a crash during an append."""
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def _append(path: str, data, mode: str, policy: Optional[FsyncPolicy]):
+    """Append to a file opened with ``mode`` and sync it as the policy says."""
+    with open(path, mode) as f:
+        f.write(data)
+        f.flush()
+        durable = policy is None or policy.due()
+        if durable:
+            os.fsync(f.fileno())
+    if policy is None:
+        return
+    if durable:
+        policy.synced(path)
+    else:
+        policy.defer(path)
+
+
+class JSONLedgerReader(Storage):
+    """Read-only backend streaming transactions from a JSON data file and its journal."""
+
+    def __init__(self, data_file: str, journal_file: Optional[str] = None):
+        """Initialize the reader."""
+        self.data_file = data_file
+        self.journal_file = journal_file
+        self.journal_entries = 0
+
+    def _iter_records(self) -> Iterator[Dict]:
+        """Iterate over the data file records followed by the journal entries."""
+        if os.path.exists(self.data_file):
+            with open(self.data_file, 'r') as f:
+                yield from iter_json_array(f)
+        yield from self.iter_journal()
+
+    def iter_journal(self) -> Iterator[Dict]:
+        """Iterate over the journal entries."""
+        self.journal_entries = 0
+        if self.journal_file and os.path.exists(self.journal_file):
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A crash during an append can leave a torn last line
+                        print("Skipping unreadable journal entry.")
+                        continue
+                    self.journal_entries += 1
+                    yield record
+
+    def iter_transactions(self, category: Optional[str] = None,
+                          transaction_type: Optional[str] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over transactions matching the filters, in insertion order."""
+        return _filter_records(self._iter_records(), category, transaction_type, start_date, end_date)
+
+
+def _filter_records(records: Iterable[Dict], category: Optional[str] = None,
+                    transaction_type: Optional[str] = None, start_date: Optional[str] = None,
+                    end_date: Optional[str] = None) -> Iterator[Dict]:
+    """Yield the transaction records matching the filters."""
+    for r in records:
+        if category is not None and r["category"] != category:
+            continue
+        if transaction_type is not None and r["transaction_type"] != transaction_type:
+            continue
+        # Files written by older versions can hold unpadded dates such as 2024-5-1
+        date = iso_date(r["date"])
+        if start_date is not None and date < start_date:
+            continue
+        if end_date is not None and date > end_date:
+            continue
+        yield r
+
+
+class SnapshotLedgerReader(JSONLedgerReader):
+    """Read-only backend over a binary column snapshot of the data file and its journal.
+    
+    The snapshot is memory-mapped, so opening it costs milliseconds however
+    large the ledger is. Filters are applied to category codes and day
+    numbers before any row is decoded, and totals are computed with NumPy
+    directly on the mapped columns.
+    """
+
+    def __init__(self, snapshot: ColumnReader, journal_file: Optional[str] = None):
+        """Initialize the reader over an open snapshot."""
+        super().__init__(None, journal_file)
+        self.snapshot = snapshot
+
+    def _code(self, column: str, value: Optional[str]) -> Optional[int]:
+        """Get the code of a dictionary value, -1 if the snapshot never saw it."""
+        if value is None:
+            return None
+        dictionary = self.snapshot.dictionaries[column]
+        return dictionary.index(value) if value in dictionary else -1
+
+    def _snapshot_rows(self, category: Optional[str], transaction_type: Optional[str],
+                       start_date: Optional[str], end_date: Optional[str]) -> Iterator[int]:
+        """Yield the numbers of the snapshot rows matching the filters."""
+        category_code = self._code("category", category)
+        type_code = self._code("transaction_type", transaction_type)
+        start = date_to_days(start_date) if start_date is not None else None
+        end = date_to_days(end_date) if end_date is not None else None
+        categories = self.snapshot.column("category")
+        types = self.snapshot.column("transaction_type")
+        dates = self.snapshot.column("date")
+        for row in range(self.snapshot.rows):
+            if category_code is not None and categories[row] != category_code:
+                continue
+            if type_code is not None and types[row] != type_code:
+                continue
+            if (start is not None and dates[row] < start) or (end is not None and dates[row] > end):
+                continue
+            yield row
+
+    def iter_transactions(self, category: Optional[str] = None,
+                          transaction_type: Optional[str] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over transactions matching the filters, in insertion order."""
+        yield from self.snapshot.iter_records(
+            self._snapshot_rows(category, transaction_type, start_date, end_date))
+        yield from _filter_records(self.iter_journal(), category, transaction_type,
+                                   start_date, end_date)
+
+    def count_transactions(self) -> int:
+        """Count stored transactions."""
+        return self.snapshot.rows + sum(1 for _ in self.iter_journal())
+
+    def _totals(self, column: str, transaction_type: Optional[str],
+                start_date: Optional[str], end_date: Optional[str]) -> Dict[str, float]:
+        """Sum the amounts per value of a dictionary column, snapshot first, then journal."""
+        import numpy as np
+        
+        totals = {}
+        if self.snapshot.rows:
+            amounts = np.frombuffer(self.snapshot.column("amount"), dtype=np.float64)
+            codes = np.frombuffer(self.snapshot.column(column), dtype=np.int32)
+            mask = None
+            if transaction_type is not None:
+                types = np.frombuffer(self.snapshot.column("transaction_type"), dtype=np.int32)
+                mask = types == self._code("transaction_type", transaction_type)
+            if start_date is not None or end_date is not None:
+                dates = np.frombuffer(self.snapshot.column("date"), dtype=np.int32)
+                in_range = np.ones(self.snapshot.rows, dtype=bool)
+                if start_date is not None:
+                    in_range &= dates >= date_to_days(start_date)
+                if end_date is not None:
+                    in_range &= dates <= date_to_days(end_date)
+                mask = in_range if mask is None else mask & in_range
+            
+            # Keys in order of first appearance, as the other backends return them.
+            # Codes were assigned in that order, so only a filtered subset needs sorting.
+            if mask is None:
+                order = np.flatnonzero(np.bincount(codes))
+            else:
+                codes, amounts = codes[mask], amounts[mask]
+                present, first_rows = np.unique(codes, return_index=True)
+                order = present[np.argsort(first_rows)]
+            # bincount adds in row order, like a Python loop would
+            sums = np.bincount(codes, weights=amounts).tolist()
+            names = self.snapshot.dictionaries[column]
+            for code in order.tolist():
+                totals[names[code]] = sums[code]
+        
+        for r in _filter_records(self.iter_journal(), None, transaction_type, start_date, end_date):
+            totals[r[column]] = totals.get(r[column], 0) + r["amount"]
+        return totals
+
+    def totals_by_type(self, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> Dict[str, float]:
+        """Get the total amount per transaction type."""
+        return self._totals("transaction_type", None, start_date, end_date)
+
+    def totals_by_category(self, transaction_type: str = "expense",
+                           start_date: Optional[str] = None,
+                           end_date: Optional[str] = None) -> Dict[str, float]:
+        """Get the total amount per category for a transaction type."""
+        return self._totals("category", transaction_type, start_date, end_date)
+
+
+TABLE_COLUMNS = {
+    "budgets": ["category", "amount", "period", "start_date", "end_date"],
+    "goals": ["name", "target_amount", "current_amount", "deadline", "category", "description"],
+    "investments": ["name", "investment_type", "purchase_date", "purchase_price",
+                    "quantity", "current_price", "last_updated"],
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    amount REAL NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL,
+    date TEXT NOT NULL,
+    transaction_type TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_transactions_date ON transactions (date);
+CREATE INDEX IF NOT EXISTS idx_transactions_category ON transactions (category, date);
+CREATE INDEX IF NOT EXISTS idx_transactions_type ON transactions (transaction_type, date);
+
+CREATE TABLE IF NOT EXISTS budgets (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    amount REAL NOT NULL,
+    period TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT
+);
+
+CREATE TABLE IF NOT EXISTS goals (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    target_amount REAL NOT NULL,
+    current_amount REAL NOT NULL,
+    deadline TEXT NOT NULL,
+    category TEXT NOT NULL,
+    description TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS investments (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    investment_type TEXT NOT NULL,
+    purchase_date TEXT NOT NULL,
+    purchase_price REAL NOT NULL,
+    quantity REAL NOT NULL,
+    current_price REAL NOT NULL,
+    last_updated TEXT NOT NULL
+);
+"""
+
+
+class SQLiteStorage(Storage):
+    """Storage backend keeping all data in a single SQLite database.
+
+    The connection is shared with the background flusher thread, so every
+    call holds a lock for as long as it uses the connection.
+    """
+
+    def __init__(self, db_file="finance.db"):
+        """Open (and create if needed) the database."""
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.RLock()
+        with self._lock, self.conn:
+            self.conn.executescript(SCHEMA)
+
+    def load_records(self, table: str) -> List[Dict]:
+        """Load all records of a table (budgets, goals or investments)."""
+        columns = TABLE_COLUMNS[table]
+        with self._lock:
+            rows = self.conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY id")
+            return [dict(row) for row in rows]
+
+    def replace_records(self, table: str, records: Iterable[Dict]):
+        """Replace the contents of a table with the given records."""
+        columns = TABLE_COLUMNS[table]
+        placeholders = ", ".join("?" for _ in columns)
+        with self._lock, self.conn:
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({placeholders})",
+                ([r[c] for c in columns] for r in records)
+            )
+
+    def _where(self, category=None, transaction_type=None, start_date=None, end_date=None):
+        """Build a WHERE clause for transaction filters."""
+        clauses = []
+        params = []
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if transaction_type is not None:
+            clauses.append("transaction_type = ?")
+            params.append(transaction_type)
+        if start_date is not None:
+            clauses.append("date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(end_date)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def iter_transactions(self, category: Optional[str] = None,
+                          transaction_type: Optional[str] = None,
+                          start_date: Optional[str] = None,
+                          end_date: Optional[str] = None) -> Iterator[Dict]:
+        """Iterate over transactions matching the filters, in insertion order."""
+        where, params = self._where(category, transaction_type, start_date, end_date)
+        with self._lock:
+            cursor = self.conn.execute(
+                f"SELECT {', '.join(TRANSACTION_COLUMNS)} FROM transactions{where} ORDER BY id", params
+            )
+        # Fetched in chunks, so the lock is never held while the caller runs
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+
+    def insert_transactions(self, records: Iterable[Dict]):
+        """Append transactions to the ledger in a single database transaction."""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO transactions (amount, category, description, date, transaction_type) "
+                "VALUES (:amount, :category, :description, :date, :transaction_type)",
+                records
+            )
+
+    def replace_transactions(self, records: Iterable[Dict]):
+        """Replace the whole ledger in a single database transaction."""
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM transactions")
+            self.conn.executemany(
+                "INSERT INTO transactions (amount, category, description, date, transaction_type) "
+                "VALUES (:amount, :category, :description, :date, :transaction_type)",
+                records
+            )
+
+    def count_transactions(self) -> int:
+        """Count stored transactions."""
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM transactions").fetchone()[0]
+
+    def totals_by_type(self, start_date: Optional[str] = None,
+                       end_date: Optional[str] = None) -> Dict[str, float]:
+        """Get the total amount per transaction type."""
+        where, params = self._where(None, None, start_date, end_date)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT transaction_type, SUM(amount) FROM transactions{where} "
+                "GROUP BY transaction_type", params
+            )
+            return {row[0]: row[1] for row in rows}
+
+    def totals_by_category(self, transaction_type: str = "expense",
+                           start_date: Optional[str] = None,
+                           end_date: Optional[str] = None) -> Dict[str, float]:
+        """Get the total amount per category for a transaction type."""
+        where, params = self._where(None, transaction_type, start_date, end_date)
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT category, SUM(amount) FROM transactions{where} "
+                "GROUP BY category ORDER BY MIN(id)", params
+            )
+            return {row[0]: row[1] for row in rows}
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
+
+
+def import_json_files(storage: Storage, data_file="finance_data.json", budget_file="budgets.json",
+                      goals_file="goals.json", investments_file="investments.json"):
+    """Copy the contents of the JSON data files into a storage backend.
+
+    Transaction dates are stored zero-padded, so SQL range queries compare
+    them correctly; rows without a valid YYYY-MM-DD date are skipped and
+    reported (they stay in the JSON file).
+    """
+    if os.path.exists(data_file):
+        with open(data_file, 'r') as f:
+            records = json.load(f)
+        transactions = []
+        for r in records:
+            try:
+                transactions.append(dict(r, date=parse_iso_date(r["date"]).isoformat()))
+            except (KeyError, TypeError, ValueError):
+                continue
+        if len(transactions) < len(records):
+            print(f"Skipped {len(records) - len(transactions)} unreadable transactions in {data_file} "
+                  "(e.g. dates not in YYYY-MM-DD format); they were left out of the database.")
+        storage.replace_transactions(transactions)
+    for table, path in (("budgets", budget_file), ("goals", goals_file),
+                        ("investments", investments_file)):
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                storage.replace_records(table, json.load(f))